@@ -14,7 +14,7 @@ except Exception:
 from telegram.ext import ApplicationBuilder, MessageHandler, filters, CommandHandler
 
 import message as _message
-from message import handle_message, handle_gold, send_gold_to, handle_money, handle_help, set_agent, send_money_to
+from message import handle_message, handle_gold, handle_money, handle_help, set_agent, broadcast, render_gold_message, render_money_message
 
 try:
     from config import MONGO_URI
@@ -92,20 +92,19 @@ async def _scheduled_gold_job(context):
         logging.info("Skipping scheduled gold job; GMT+7 time %02d:%02d not in schedule", now.hour, now.minute)
         return
 
-    for cid in CHAT_LIST:
-        try:
-            await send_gold_to(cid, context)
-        except Exception:
-            logging.exception("Failed sending scheduled gold to %s", cid)
+    if not _message.agent:
+        return
+    # Render once, then fan out to every chat
+    text = await render_gold_message()
+    await broadcast(context.bot, CHAT_LIST, text)
 
 
 async def _scheduled_money_job(context):
     """Send USD+JPY exchange rates daily at 09:00 UTC+7."""
-    for cid in CHAT_LIST:
-        try:
-            await send_money_to(cid, context)
-        except Exception:
-            logging.exception("Failed sending scheduled money rate to %s", cid)
+    if not _message.agent:
+        return
+    text = await render_money_message()
+    await broadcast(context.bot, CHAT_LIST, text)
 
 # ---------------------------------------------------------------------------
 # Main
@@ -185,8 +184,9 @@ def main():
         logging.info("Scheduled money rate job at 09:00 UTC+7")
 
         if watcher is not None:
-            jobq.run_repeating(watcher.job, interval=300, first=30)
-            logging.info('Registered GoldWatcher changes job (every 5 minutes)')
+            poll_interval = watcher.poll_interval
+            jobq.run_repeating(watcher.job, interval=poll_interval, first=30)
+            logging.info('Registered GoldWatcher changes job (every %.0f seconds)', poll_interval)
 
     app.run_polling()
 
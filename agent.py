@@ -1,43 +1,106 @@
-import logging
+import asyncio
+import importlib
 import json
-import xml.etree.ElementTree as ET
-import re
-from typing import Any, Dict, List, Optional, Protocol
+import logging
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Protocol
+from config import (AGENT_CACHE_PATH, AGENT_CACHE_SIZE, AGENT_CACHE_TTL, AGENT_MEMORY_TOKENS,
+                    AGENT_MEMORY_TURNS, AGENT_TOOLS)
+from conversation_memory import ConversationMemory
 from mcp_playwright_agent import MCPPlaywrightAgent
-from api_client import APIClient
-from crawl_gold_price import GoldPriceService
-from eximbank_exchange_rate import EximbankExchangeRateService
+from response_cache import ResponseCache
+from registry import get_api_client, get_gold_service, get_eximbank_service
 
-# Prefer requests if available, fall back to urllib
-try:
-    import requests
-except ImportError:
-    requests = None
-import ssl
+# Legacy endpoints are called with verify=False; keep the logs free of warnings
 try:
     import urllib3
     urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 except Exception:
     urllib3 = None
-import urllib.request
-import urllib.error
-import time
 
-# Optional imports for AI providers
-try:
-    import google.generativeai as genai
-except ImportError:
-    genai = None
-try:
-    from xai_sdk import Client as xai_Client
-    from xai_sdk.chat import user as xai_user, system as xai_system
-except ImportError:
-    xai_Client = None
-try:
-    import openai
-except ImportError:
-    openai = None
-# Azure OpenAI can use openai with endpoint config
+
+# ---------------------------------------------------------------------------
+# AI provider backends
+# ---------------------------------------------------------------------------
+# Each SDK is imported on first use of its provider, so startup and CLI
+# commands only pay for the provider that is actually configured.
+
+def _load_gemini():
+    return importlib.import_module('google.generativeai')
+
+
+def _load_xai():
+    chat = importlib.import_module('xai_sdk.chat')
+    return SimpleNamespace(Client=importlib.import_module('xai_sdk').Client, user=chat.user, system=chat.system,
+                           assistant=chat.assistant, tool=chat.tool, tool_result=chat.tool_result)
+
+
+def _load_openai():
+    # Azure OpenAI uses the openai package with endpoint config
+    return importlib.import_module('openai')
+
+
+_BACKENDS: Dict[str, Callable[[], Any]] = {
+    'gemini': _load_gemini,
+    'xai': _load_xai,
+    'openai': _load_openai,
+    'azure': _load_openai,
+}
+_loaded_backends: Dict[str, Any] = {}
+
+
+def register_backend(provider: str, loader: Callable[[], Any]) -> None:
+    """Register *loader*, which imports and returns the SDK for *provider*."""
+    _BACKENDS[provider.lower()] = loader
+    _loaded_backends.pop(provider.lower(), None)
+
+
+def load_backend(provider: str) -> Optional[Any]:
+    """Return the SDK for *provider*, importing it on first use.
+
+    Returns None for unknown providers or when the package is not installed.
+    """
+    provider = provider.lower()
+    if provider not in _loaded_backends:
+        loader = _BACKENDS.get(provider)
+        if loader is None:
+            return None
+        try:
+            _loaded_backends[provider] = loader()
+        except ImportError:
+            logging.warning('AI provider package for %s is not installed', provider)
+            return None
+    return _loaded_backends[provider]
+
+
+# ---------------------------------------------------------------------------
+# Tools
+# ---------------------------------------------------------------------------
+# Functions the model may call. They are answered from the shared gold
+# snapshot and Eximbank table caches, so any number of chats asking within
+# one cache window cost at most one crawl.
+TOOL_SPECS: List[Dict[str, Any]] = [
+    {
+        "name": "get_gold_price",
+        "description": "Giá vàng trong nước hiện tại (VND) của Mi Hồng, DOJI và Ngọc Thẩm: "
+                       "giá mua/bán và thay đổi trong ngày (mức nguồn công bố, hoặc so với giá "
+                       "đầu tiên hôm nay; nếu hôm nay chưa có thì so với giá cuối hôm qua).",
+        "parameters": {"type": "object", "properties": {}},
+    },
+    {
+        "name": "get_money_rate",
+        "description": "Tỷ giá ngoại tệ của Eximbank (mua/bán tiền mặt và chuyển khoản, VND).",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "code": {"type": "string", "description": "Mã tiền tệ ISO, ví dụ USD, JPY, EUR. Bỏ trống để lấy USD và JPY."},
+            },
+        },
+    },
+]
+
+# Model calls per question when the model keeps requesting tools
+MAX_TOOL_ROUNDS = 3
 
 
 class Agent:
@@ -46,63 +109,326 @@ class Agent:
         self.api_key = api_key
         self.kwargs = kwargs
         self.mcp_agent = MCPPlaywrightAgent()
-        # initialize a reusable API client (disable SSL verification for legacy endpoints)
-        self.api_client = APIClient(verify=False)
-        # initialize gold price service with optional MongoDB URI for change computation
+        # shared process-wide API client (SSL verification disabled for legacy endpoints)
+        self.api_client = get_api_client()
+        # shared gold price service with optional MongoDB URI for change computation
         mongo_uri = kwargs.get('mongo_uri')
-        self.gold_service = GoldPriceService(self.api_client, mongo_uri=mongo_uri)
-        self.eximbank_service = EximbankExchangeRateService(self.api_client)
-
-        if self.provider == "gemini" and genai:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel(kwargs.get('model', 'models/gemini-2.5-flash'))
-        elif self.provider == "xai" and xai_Client:
-            self.xai_client = xai_Client(api_key=api_key)
+        self.gold_service = get_gold_service(mongo_uri)
+        self.eximbank_service = get_eximbank_service()
+
+        self.sdk = load_backend(self.provider)
+        if self.sdk is None:
+            raise ValueError(f"Unsupported provider or missing package: {provider}")
+
+        # Let the model call get_gold_price/get_money_rate (tools or AGENT_TOOLS)
+        self.tools_enabled = kwargs.get('tools', AGENT_TOOLS)
+
+        if self.provider == "gemini":
+            self.sdk.configure(api_key=api_key)
+            self.model_name = kwargs.get('model', 'models/gemini-2.5-flash')
+            # Gemini rejects object schemas without properties; drop them
+            declarations = [
+                {key: value for key, value in spec.items() if key != "parameters" or value["properties"]}
+                for spec in TOOL_SPECS
+            ]
+            tools = [{"function_declarations": declarations}] if self.tools_enabled else None
+            self.model = self.sdk.GenerativeModel(self.model_name, tools=tools)
+        elif self.provider == "xai":
+            self.xai_client = self.sdk.Client(api_key=api_key)
             self.xai_model = kwargs.get('model', 'grok-4-0709')
             self.xai_temperature = kwargs.get('temperature', 0)
-        elif self.provider == "openai" and openai:
-            openai.api_key = api_key
+            self.model_name = self.xai_model
+        elif self.provider == "openai":
+            self.openai_client = self.sdk.OpenAI(api_key=api_key)
             self.openai_model = kwargs.get('model', 'gpt-3.5-turbo')
+            self.model_name = self.openai_model
         elif self.provider == "azure":
-            # Azure OpenAI setup
-            openai.api_key = api_key
-            openai.api_base = kwargs.get('api_base')
-            openai.api_type = "azure"
-            openai.api_version = kwargs.get('api_version', '2023-05-15')
+            # Azure OpenAI setup; tool calls need API version 2023-12-01-preview or later
+            self.openai_client = self.sdk.AzureOpenAI(
+                api_key=api_key,
+                azure_endpoint=kwargs.get('api_base'),
+                api_version=kwargs.get('api_version') or '2024-02-01',
+            )
             self.azure_deployment = kwargs.get('deployment', 'gpt-35-turbo')
-        else:
-            raise ValueError(f"Unsupported provider or missing package: {provider}")
+            # Azure addresses the deployment where OpenAI takes a model name
+            self.openai_model = self.azure_deployment
+            self.model_name = self.azure_deployment
 
-    def ask(self, prompt, system_prompt=None):
-        logging.info(f"AI Request ({self.provider}): {prompt}")
-        if self.provider == "gemini" and genai:
-            response = self.model.generate_content(prompt)
-            result = response.text if hasattr(response, 'text') else str(response)
-        elif self.provider == "xai" and xai_Client:
-            chat = self.xai_client.chat.create(model=self.xai_model, temperature=self.xai_temperature)
-            if system_prompt:
-                chat.append(xai_system(system_prompt))
-            chat.append(xai_user(prompt))
-            response = chat.sample()
-            result = response.content
-        elif self.provider == "openai" and openai:
-            completion = openai.ChatCompletion.create(
-                model=self.openai_model,
-                messages=[{"role": "system", "content": system_prompt or "You are a helpful assistant."},
-                          {"role": "user", "content": prompt}]
-            )
-            result = completion.choices[0].message.content
-        elif self.provider == "azure" and openai:
-            completion = openai.ChatCompletion.create(
-                engine=self.azure_deployment,
-                messages=[{"role": "system", "content": system_prompt or "You are a helpful assistant."},
-                          {"role": "user", "content": prompt}]
-            )
-            result = completion.choices[0].message.content
+        # Opt-in exact-match reply cache (cache_size/cache_ttl/cache_path or AGENT_CACHE_*)
+        cache_size = kwargs.get('cache_size', AGENT_CACHE_SIZE)
+        self.response_cache = ResponseCache(
+            maxsize=cache_size,
+            ttl=kwargs.get('cache_ttl', AGENT_CACHE_TTL),
+            path=kwargs.get('cache_path', AGENT_CACHE_PATH),
+        ) if cache_size > 0 else None
+        # Per-chat history for follow-up questions (memory_turns/memory_tokens or AGENT_MEMORY_*)
+        memory_turns = kwargs.get('memory_turns', AGENT_MEMORY_TURNS)
+        self.memory = ConversationMemory(
+            max_turns=memory_turns,
+            max_tokens=kwargs.get('memory_tokens', AGENT_MEMORY_TOKENS),
+        ) if memory_turns > 0 else None
+
+    def _cache_key(self, prompt, system_prompt):
+        return ResponseCache.key(self.provider, self.model_name, system_prompt, prompt)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the reply cache ({} when it is off)."""
+        return self.response_cache.stats() if self.response_cache is not None else {}
+
+    def _history(self, prompt, chat_id=None) -> List[Dict[str, str]]:
+        """Messages for *prompt*: summary of older turns, recent turns of *chat_id*, then the prompt."""
+        messages = []
+        if chat_id is not None and self.memory is not None:
+            summary, turns = self.memory.context(chat_id, prompt)
+            if summary:
+                messages.append({"role": "system", "content": f"Tóm tắt hội thoại trước:\n{summary}"})
+            messages.extend({"role": role, "content": text} for role, text in turns)
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    def _remember(self, chat_id, prompt, reply) -> None:
+        if chat_id is not None and self.memory is not None and reply:
+            self.memory.add_turn(chat_id, prompt, reply)
+
+    def _cached_reply(self, prompt, system_prompt, history):
+        """Return (cache key, cached reply); only context-free questions are cached."""
+        if self.response_cache is None or len(history) > 1:
+            return None, None
+        key = self._cache_key(prompt, system_prompt)
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            logging.info(f"AI Cache hit ({self.provider}): {prompt}")
+        return key, cached
+
+    def _gemini_contents(self, history):
+        contents, preamble = [], []
+        for message in history:
+            if message["role"] == "system":
+                preamble.append(message["content"])
+                continue
+            text = message["content"]
+            if preamble and message["role"] == "user":
+                text = "\n\n".join(preamble + [text])
+                preamble = []
+            contents.append({"role": "user" if message["role"] == "user" else "model", "parts": [text]})
+        return contents
+
+    def _xai_chat(self, history, system_prompt):
+        tools = [self.sdk.tool(**spec) for spec in TOOL_SPECS] if self.tools_enabled else None
+        chat = self.xai_client.chat.create(model=self.xai_model, temperature=self.xai_temperature, tools=tools)
+        if system_prompt:
+            chat.append(self.sdk.system(system_prompt))
+        roles = {"system": self.sdk.system, "user": self.sdk.user, "assistant": self.sdk.assistant}
+        for message in history:
+            chat.append(roles[message["role"]](message["content"]))
+        return chat
+
+    @staticmethod
+    def _openai_messages(history, system_prompt):
+        return [{"role": "system", "content": system_prompt or "You are a helpful assistant."}] + history
+
+    def call_tool(self, name: str, arguments: Any = None) -> str:
+        """Run tool *name* with *arguments* (dict or JSON string) and return its JSON result."""
+        if isinstance(arguments, str):
+            try:
+                arguments = json.loads(arguments) if arguments.strip() else {}
+            except ValueError:
+                arguments = {}
+        arguments = dict(arguments or {})
+        logging.info(f"AI Tool call ({self.provider}): {name}({arguments})")
+        try:
+            if name == "get_gold_price":
+                result = self._gold_price_summary()
+            elif name == "get_money_rate":
+                result = self.eximbank_service.get_rate(arguments.get("code") or None)
+            else:
+                result = {"error": f"Unknown tool: {name}"}
+        except Exception as e:
+            logging.exception('Tool %s failed', name)
+            result = {"error": str(e)}
+        return json.dumps(result, ensure_ascii=False, default=str)
+
+    def _gold_price_summary(self) -> Dict[str, Any]:
+        """Compact view of the cached gold snapshot for the model."""
+        snapshot = self.gold_service.get_snapshot()
+        return {
+            "as_of": snapshot.get("as_of"),
+            "currency": snapshot.get("currency"),
+            "prices": [
+                {
+                    "source": item.get("source"),
+                    "code": item.get("code"),
+                    "buy": item.get("buyPrice"),
+                    "sell": item.get("sellPrice"),
+                    "buy_change": item.get("buyChange"),
+                    "sell_change": item.get("sellChange"),
+                }
+                for item in snapshot.get("normalized", [])
+            ],
+            "unavailable": [src.get("name") for src in snapshot.get("sources", []) if src.get("status") != "ok"],
+        }
+
+    def ask(self, prompt, system_prompt=None, chat_id=None):
+        """Return the reply to *prompt*; with *chat_id* the chat's recent history is sent along."""
+        return ''.join(self.stream(prompt, system_prompt, chat_id))
+
+    async def aask(self, prompt, system_prompt=None, chat_id=None):
+        """Async variant of `ask`; the provider call runs on a worker thread."""
+        return await asyncio.to_thread(self.ask, prompt, system_prompt, chat_id)
+
+    def stream(self, prompt, system_prompt=None, chat_id=None) -> Iterator[str]:
+        """Yield the reply to *prompt* in pieces as the provider generates it.
+
+        Blocking; use `astream` from the event loop. A cached reply is
+        yielded in one piece. The turn is added to *chat_id*'s history once
+        the reply is complete. Replies built from tool results are not
+        cached, since they go stale with the prices.
+        """
+        history = self._history(prompt, chat_id)
+        key, cached = self._cached_reply(prompt, system_prompt, history)
+        if cached is not None:
+            self._remember(chat_id, prompt, cached)
+            yield cached
+            return
+        parts = []
+        state = {"tools_used": False}
+        for text in self._stream_provider(history, system_prompt, state):
+            parts.append(text)
+            yield text
+        reply = ''.join(parts)
+        if key is not None and not state["tools_used"]:
+            self.response_cache.put(key, reply)
+        self._remember(chat_id, prompt, reply)
+
+    def _stream_provider(self, history, system_prompt=None, state=None) -> Iterator[str]:
+        """Stream one reply, answering tool calls for up to MAX_TOOL_ROUNDS model calls."""
+        logging.info(f"AI Request ({self.provider}): {history[-1]['content']}")
+        state = state if state is not None else {}
+        parts = []
+        if self.provider == "gemini":
+            stream = self._stream_gemini(history, state)
+        elif self.provider == "xai":
+            stream = self._stream_xai(history, system_prompt, state)
+        elif self.provider in ("openai", "azure"):
+            stream = self._stream_openai(history, system_prompt, state)
         else:
-            result = "AI provider not available or not configured."
-        logging.info(f"AI Response ({self.provider}): {result}")
-        return result
+            stream = iter(["AI provider not available or not configured."])
+        for text in stream:
+            if text:
+                parts.append(text)
+                yield text
+        logging.info(f"AI Response ({self.provider}): {''.join(parts)}")
+
+    def _stream_gemini(self, history, state) -> Iterator[str]:
+        contents = self._gemini_contents(history)
+        for _ in range(MAX_TOOL_ROUNDS):
+            calls = []
+            for chunk in self.model.generate_content(contents, stream=True):
+                # chunk.text raises on function-call parts, so read the parts
+                for candidate in getattr(chunk, 'candidates', None) or []:
+                    for part in candidate.content.parts:
+                        if part.function_call and part.function_call.name:
+                            calls.append(part.function_call)
+                        elif part.text:
+                            yield part.text
+            if not calls:
+                return
+            state["tools_used"] = True
+            protos = self.sdk.protos
+            contents.append({"role": "model", "parts": [protos.Part(function_call=call) for call in calls]})
+            contents.append({"role": "user", "parts": [
+                protos.Part(function_response=protos.FunctionResponse(
+                    name=call.name,
+                    response={"result": json.loads(self.call_tool(call.name, dict(call.args)))},
+                ))
+                for call in calls
+            ]})
+        logging.warning('AI (%s) still requesting tools after %d rounds', self.provider, MAX_TOOL_ROUNDS)
+
+    def _stream_xai(self, history, system_prompt, state) -> Iterator[str]:
+        chat = self._xai_chat(history, system_prompt)
+        for _ in range(MAX_TOOL_ROUNDS):
+            response = None
+            for response, chunk in chat.stream():
+                yield chunk.content or ''
+            calls = list(response.tool_calls) if response is not None else []
+            if not calls:
+                return
+            state["tools_used"] = True
+            chat.append(response)
+            for call in calls:
+                result = self.call_tool(call.function.name, call.function.arguments)
+                chat.append(self.sdk.tool_result(result, tool_call_id=call.id))
+        logging.warning('AI (%s) still requesting tools after %d rounds', self.provider, MAX_TOOL_ROUNDS)
+
+    def _stream_openai(self, history, system_prompt, state) -> Iterator[str]:
+        options = {'model': self.openai_model}
+        if self.tools_enabled:
+            options['tools'] = [{"type": "function", "function": spec} for spec in TOOL_SPECS]
+        messages = self._openai_messages(history, system_prompt)
+        for _ in range(MAX_TOOL_ROUNDS):
+            # tool calls arrive in fragments, keyed by their index in the reply
+            calls: Dict[int, Dict[str, str]] = {}
+            completion = self.openai_client.chat.completions.create(messages=messages, stream=True, **options)
+            for chunk in completion:
+                if not chunk.choices:
+                    continue  # Azure sends content-filter results without choices
+                delta = chunk.choices[0].delta
+                for fragment in delta.tool_calls or []:
+                    call = calls.setdefault(fragment.index, {"id": "", "name": "", "arguments": ""})
+                    call["id"] = fragment.id or call["id"]
+                    if fragment.function is not None:
+                        call["name"] += fragment.function.name or ''
+                        call["arguments"] += fragment.function.arguments or ''
+                yield delta.content or ''
+            if not calls:
+                return
+            state["tools_used"] = True
+            ordered = [calls[index] for index in sorted(calls)]
+            messages.append({"role": "assistant", "content": None, "tool_calls": [
+                {"id": call["id"], "type": "function",
+                 "function": {"name": call["name"], "arguments": call["arguments"]}}
+                for call in ordered
+            ]})
+            for call in ordered:
+                messages.append({"role": "tool", "tool_call_id": call["id"],
+                                 "content": self.call_tool(call["name"], call["arguments"])})
+        logging.warning('AI (%s) still requesting tools after %d rounds', self.provider, MAX_TOOL_ROUNDS)
+
+    async def astream(self, prompt, system_prompt=None, chat_id=None) -> AsyncIterator[str]:
+        """Async iterator over `stream`; the provider runs on a worker thread.
+
+        Pieces are handed to the event loop as they arrive, so other updates
+        keep being served while a reply is generated.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        def _produce():
+            def _put(item):
+                try:
+                    loop.call_soon_threadsafe(queue.put_nowait, item)
+                except RuntimeError:
+                    pass  # event loop already closed
+            try:
+                for text in self.stream(prompt, system_prompt, chat_id):
+                    if text:
+                        _put(text)
+            except Exception as e:
+                _put(e)
+            finally:
+                _put(done)
+
+        worker = loop.run_in_executor(None, _produce)
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+        await worker
 
     def run_playwright(self, command):
         logging.info(f"Playwright Command: {command}")
@@ -118,3 +444,7 @@ class Agent:
         or omitted to get both USD and JPY by default.
         """
         return self.eximbank_service.get_rate(code)
+
+    async def aget_money_rate(self, code=None):
+        """Async variant of `get_money_rate` for use inside bot handlers."""
+        return await self.eximbank_service.aget_rate(code)
@@ -9,25 +9,312 @@ Each method returns a dictionary with keys:
 - text (raw response text)
 - json (parsed JSON or None)
 - error (exception string on failure)
+- not_modified (GET only: True when served from the HTTP cache)
+
+Successful responses are `APIResponse` dicts: `text` and `json` are only
+decoded on first access, so a caller that never reads them never pays for
+them. `extract_json_array(resp, key)` pulls a single top-level array (e.g.
+``"data"``) out of a JSON body without parsing the rest of the document.
+
+GET responses carrying an ETag or Last-Modified header are kept in a
+bounded LRU cache; later GETs of the same URL send If-None-Match /
+If-Modified-Since and a 304 is answered from the cache. Passing
+`cache_ttl` also caches responses without validators and serves them
+without any request while they are younger than the TTL.
+
+Connections are pooled per host and kept alive between calls: with
+requests each host gets its own Session, and the urllib fallback keeps
+idle `http.client` connections. `connection_stats()` reports how many
+requests reused an existing connection.
+
+`AsyncAPIClient` offers the same methods and result dicts as coroutines
+for code running on the bot's asyncio loop. It uses httpx when installed
+and otherwise runs the blocking client on a worker thread.
 
 Designed to be safe to import and use from `agent.py`.
 """
-from typing import Optional, Any, Dict
+from typing import Optional, Any, Callable, Dict, List, Tuple
+import asyncio
+import gzip
+import http.client
 import json
+import re
 import ssl
+import threading
+import time
+import zlib
+from collections import OrderedDict
 try:
     import requests
+    from requests.adapters import HTTPAdapter
 except Exception:
     requests = None
-import urllib.request
+    HTTPAdapter = None
+try:
+    import httpx
+except Exception:
+    httpx = None
 import urllib.parse
 import urllib.error
 
 
+_REDIRECT_CODES = {301, 302, 303, 307, 308}
+_MAX_REDIRECTS = 5
+
+
+class APIResponse(dict):
+    """Result dict whose ``text`` and ``json`` entries are decoded lazily.
+
+    The raw body is kept as bytes; ``text`` is decoded on first access (via
+    *text_loader* when given, else UTF-8 with a latin-1 fallback) and
+    ``json`` is parsed straight from the bytes on first access. Iterating,
+    copying or serializing the dict materializes both.
+    """
+
+    _LAZY_KEYS = ('text', 'json')
+
+    def __init__(self, ok: bool, status_code: Optional[int], headers: Dict[str, Any], content: bytes,
+                 text_loader: Optional[Callable[[], str]] = None, error: Optional[str] = None):
+        super().__init__(ok=ok, status_code=status_code, headers=headers, error=error)
+        self._content = content or b''
+        self._text_loader = text_loader
+
+    @property
+    def content(self) -> bytes:
+        return self._content
+
+    def __missing__(self, key):
+        if key == 'text':
+            if self._text_loader is not None:
+                value = self._text_loader()
+            else:
+                try:
+                    value = self._content.decode('utf-8')
+                except Exception:
+                    value = self._content.decode('latin-1', errors='ignore')
+        elif key == 'json':
+            value = None
+            if self._content.strip():
+                try:
+                    value = json.loads(self._content)
+                except Exception:
+                    try:
+                        value = json.loads(self['text'])
+                    except Exception:
+                        value = None
+        else:
+            raise KeyError(key)
+        dict.__setitem__(self, key, value)
+        return value
+
+    def get(self, key, default=None):
+        if key in self._LAZY_KEYS:
+            return self[key]
+        return super().get(key, default)
+
+    def __contains__(self, key):
+        return key in self._LAZY_KEYS or super().__contains__(key)
+
+    def _materialize(self) -> None:
+        for key in self._LAZY_KEYS:
+            self[key]
+
+    def __iter__(self):
+        self._materialize()
+        return super().__iter__()
+
+    def __len__(self):
+        self._materialize()
+        return super().__len__()
+
+    def keys(self):
+        self._materialize()
+        return super().keys()
+
+    def items(self):
+        self._materialize()
+        return super().items()
+
+    def values(self):
+        self._materialize()
+        return super().values()
+
+    def __repr__(self):
+        self._materialize()
+        return super().__repr__()
+
+    def copy(self) -> 'APIResponse':
+        """Shallow copy that keeps undecoded entries lazy."""
+        clone = APIResponse.__new__(APIResponse)
+        dict.update(clone, dict.items(self))
+        clone._content = self._content
+        clone._text_loader = self._text_loader
+        return clone
+
+
+def extract_json_array(resp: Dict[str, Any], key: str) -> Optional[List[Any]]:
+    """Return the JSON array stored under *key* in a response body, or None.
+
+    Only the array itself is decoded: the body is scanned for ``"key": [`` as
+    a member of the top-level object (keys of nested objects and text inside
+    string values are skipped) and parsing stops at the matching ``]``. Falls
+    back to the already parsed ``json`` entry when the body is not available
+    as bytes.
+    """
+    content = resp.content if isinstance(resp, APIResponse) else None
+    if content is None:
+        parsed = resp.get('json')
+        value = parsed.get(key) if isinstance(parsed, dict) else None
+        return value if isinstance(value, list) else None
+
+    wanted = json.dumps(key, ensure_ascii=False).encode('utf-8')
+    depth = 0
+    for token in _JSON_TOKEN_RE.finditer(content):
+        text = token.group()
+        if text in (b'{', b'['):
+            if depth == 0 and text != b'{':
+                return None
+            depth += 1
+        elif text in (b'}', b']'):
+            depth -= 1
+            if depth <= 0:
+                return None
+        elif depth == 1 and text == wanted:
+            m = _JSON_MEMBER_ARRAY_RE.match(content, token.end())
+            if m:
+                try:
+                    tail = content[m.end() - 1:].decode('utf-8')
+                    value, _ = _JSON_DECODER.raw_decode(tail)
+                except Exception:
+                    return None
+                return value if isinstance(value, list) else None
+    return None
+
+
+_JSON_DECODER = json.JSONDecoder()
+# strings (with escapes) and brackets: enough to track nesting depth
+_JSON_TOKEN_RE = re.compile(rb'"(?:[^"\\]|\\.)*"|[{}\[\]]', re.DOTALL)
+_JSON_MEMBER_ARRAY_RE = re.compile(rb'\s*:\s*\[')
+
+
+class _ConnectionCache:
+    """Keep-alive cache of idle `http.client` connections for the urllib path."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._idle: Dict[Tuple[str, str, bool], List[http.client.HTTPConnection]] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def checkout(self, scheme: str, netloc: str, verify: bool, timeout: float):
+        """Return (connection, reused) for the host, opening one if none is idle."""
+        key = (scheme, netloc, verify)
+        with self._lock:
+            stats = self._stats.setdefault(f"{scheme}://{netloc}", {'requests': 0, 'connections': 0})
+            stats['requests'] += 1
+            idle = self._idle.get(key)
+            if idle:
+                conn = idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+            stats['connections'] += 1
+
+        if scheme == 'https':
+            ctx = ssl.create_default_context() if verify else ssl._create_unverified_context()
+            return http.client.HTTPSConnection(netloc, timeout=timeout, context=ctx), False
+        return http.client.HTTPConnection(netloc, timeout=timeout), False
+
+    def checkin(self, scheme: str, netloc: str, verify: bool, conn) -> None:
+        key = (scheme, netloc, verify)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.maxsize:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {host: dict(v) for host, v in self._stats.items()}
+
+    def close(self) -> None:
+        with self._lock:
+            conns = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for conn in conns:
+            conn.close()
+
+
 class APIClient:
-    def __init__(self, verify: bool = True, default_headers: Optional[Dict[str, str]] = None):
+    def __init__(self, verify: bool = True, default_headers: Optional[Dict[str, str]] = None,
+                 pool_connections: int = 10, pool_maxsize: int = 10, cache_size: int = 128):
         self.verify = verify
         self.default_headers = default_headers or {}
+        # LRU of cached GET responses keyed by full URL; 0 disables the cache
+        self.cache_size = cache_size
+        self._http_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._http_cache_lock = threading.Lock()
+        # Per-host pools: `pool_maxsize` keep-alive connections per host,
+        # `pool_connections` hosts cached by each session's pool manager.
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self._sessions: Dict[str, Any] = {}
+        self._sessions_lock = threading.Lock()
+        self._conn_cache = _ConnectionCache(pool_maxsize)
+
+    def _session_for(self, url: str):
+        """Return the pooled requests Session for the URL's scheme and host."""
+        parts = urllib.parse.urlsplit(url)
+        host_key = f"{parts.scheme}://{parts.netloc}"
+        with self._sessions_lock:
+            session = self._sessions.get(host_key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._sessions[host_key] = session
+            return session
+
+    def connection_stats(self) -> Dict[str, Dict[str, int]]:
+        """Return per-host request/connection counts and how many requests reused a connection."""
+        stats: Dict[str, Dict[str, int]] = {}
+        with self._sessions_lock:
+            sessions = list(self._sessions.items())
+        for host_key, session in sessions:
+            total = {'requests': 0, 'connections': 0}
+            for adapter in {id(a): a for a in session.adapters.values()}.values():
+                pools = getattr(getattr(adapter, 'poolmanager', None), 'pools', None)
+                if pools is None:
+                    continue
+                for pool_key in pools.keys():
+                    pool = pools.get(pool_key)
+                    total['requests'] += getattr(pool, 'num_requests', 0)
+                    total['connections'] += getattr(pool, 'num_connections', 0)
+            stats[host_key] = total
+        for host_key, counts in self._conn_cache.stats().items():
+            total = stats.setdefault(host_key, {'requests': 0, 'connections': 0})
+            total['requests'] += counts['requests']
+            total['connections'] += counts['connections']
+        for total in stats.values():
+            total['reused'] = max(0, total['requests'] - total['connections'])
+        return stats
+
+    def close(self) -> None:
+        """Close every pooled connection."""
+        with self._sessions_lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+        self._conn_cache.close()
+
+    def clear_cache(self) -> None:
+        """Drop every cached GET response."""
+        with self._http_cache_lock:
+            self._http_cache.clear()
 
     def _build_headers(self, headers: Optional[Dict[str, str]]):
         h = dict(self.default_headers)
@@ -36,11 +323,65 @@ class APIClient:
         return h
 
     def get(self, url: str, params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None,
-            timeout: int = 10, verify: Optional[bool] = None):
+            timeout: int = 10, verify: Optional[bool] = None, cache_ttl: Optional[float] = None):
         if params:
             qs = urllib.parse.urlencode(params)
             url = f"{url}?{qs}"
-        return self._request('GET', url, None, headers, timeout, verify)
+        if self.cache_size <= 0:
+            return self._request('GET', url, None, headers, timeout, verify)
+
+        entry = self._cache_lookup(url)
+        if entry is not None and cache_ttl and time.monotonic() - entry['stored_at'] < cache_ttl:
+            return self._cached_result(entry)
+
+        req_headers = dict(headers or {})
+        if entry is not None:
+            if entry['etag']:
+                req_headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                req_headers['If-Modified-Since'] = entry['last_modified']
+
+        resp = self._request('GET', url, None, req_headers, timeout, verify)
+        if resp.get('status_code') == 304 and entry is not None:
+            entry['stored_at'] = time.monotonic()
+            return self._cached_result(entry)
+
+        resp['not_modified'] = False
+        if resp.get('ok') and resp.get('status_code') == 200:
+            self._cache_store(url, resp, cache_ttl)
+        return resp
+
+    def _cache_lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._http_cache_lock:
+            entry = self._http_cache.get(url)
+            if entry is not None:
+                self._http_cache.move_to_end(url)
+            return entry
+
+    def _cache_store(self, url: str, resp: Dict[str, Any], cache_ttl: Optional[float]) -> None:
+        resp_headers = {k.lower(): v for k, v in (resp.get('headers') or {}).items()}
+        etag = resp_headers.get('etag')
+        last_modified = resp_headers.get('last-modified')
+        if not (etag or last_modified or cache_ttl):
+            return
+        entry = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'stored_at': time.monotonic(),
+            'response': resp.copy(),
+        }
+        with self._http_cache_lock:
+            self._http_cache[url] = entry
+            self._http_cache.move_to_end(url)
+            while len(self._http_cache) > self.cache_size:
+                self._http_cache.popitem(last=False)
+
+    @staticmethod
+    def _cached_result(entry: Dict[str, Any]) -> Dict[str, Any]:
+        result = entry['response'].copy()
+        result['headers'] = dict(result.get('headers') or {})
+        result['not_modified'] = True
+        return result
 
     def post(self, url: str, data: Optional[Any] = None, json_body: Optional[Any] = None,
              headers: Optional[Dict[str, str]] = None, timeout: int = 10, verify: Optional[bool] = None):
@@ -72,23 +413,19 @@ class APIClient:
                     # send raw payload as data
                     req_kwargs['data'] = payload
                 req_kwargs['verify'] = verify_final
-                r = requests.request(**req_kwargs)
-                try:
-                    parsed = r.json()
-                except Exception:
-                    parsed = None
-                return {
-                    'ok': r.ok,
-                    'status_code': r.status_code,
-                    'headers': dict(r.headers) if r.headers is not None else {},
-                    'text': r.text,
-                    'json': parsed,
-                    'error': None
-                }
+                r = self._session_for(url).request(**req_kwargs)
+                # text keeps requests' charset detection, but only when asked for
+                return APIResponse(
+                    ok=r.ok,
+                    status_code=r.status_code,
+                    headers=dict(r.headers) if r.headers is not None else {},
+                    content=r.content,
+                    text_loader=lambda: r.text,
+                )
             except Exception as e:
                 return {'ok': False, 'status_code': None, 'headers': {}, 'text': '', 'json': None, 'error': str(e)}
 
-        # Fallback: urllib
+        # Fallback: http.client with cached keep-alive connections
         try:
             data_bytes = None
             if payload is not None:
@@ -104,27 +441,158 @@ class APIClient:
                     # try to stringify
                     data_bytes = str(payload).encode('utf-8')
 
-            req = urllib.request.Request(url, data=data_bytes, headers=hdrs, method=method)
-            ctx = None if verify_final else ssl._create_unverified_context()
-            with urllib.request.urlopen(req, timeout=timeout, context=ctx) as resp:
-                raw = resp.read()
+            status, reason, resp_headers, raw = self._urllib_request(
+                method, url, data_bytes, hdrs, timeout, verify_final
+            )
+            if status >= 400:
                 try:
                     text = raw.decode('utf-8')
                 except Exception:
                     text = raw.decode('latin-1', errors='ignore')
-                resp_headers = dict(resp.getheaders()) if hasattr(resp, 'getheaders') else {}
-                parsed = None
+                return {'ok': False, 'status_code': status, 'headers': {}, 'text': text, 'json': None,
+                        'error': f"HTTP Error {status}: {reason}"}
+            return APIResponse(ok=True, status_code=status or None, headers=resp_headers, content=raw)
+        except Exception as e:
+            return {'ok': False, 'status_code': None, 'headers': {}, 'text': '', 'json': None, 'error': str(e)}
+
+    def _urllib_request(self, method: str, url: str, data_bytes: Optional[bytes], hdrs: Dict[str, str],
+                        timeout: int, verify: bool):
+        """Send a request over a cached connection, following redirects.
+
+        Returns (status, reason, headers, body bytes). A request on a reused
+        connection that the server already closed is retried once on a new one.
+        """
+        for _ in range(_MAX_REDIRECTS + 1):
+            parts = urllib.parse.urlsplit(url)
+            path = parts.path or '/'
+            if parts.query:
+                path = f"{path}?{parts.query}"
+            while True:
+                conn, reused = self._conn_cache.checkout(parts.scheme, parts.netloc, verify, timeout)
                 try:
-                    parsed = json.loads(text)
+                    conn.request(method, path, body=data_bytes, headers=hdrs)
+                    resp = conn.getresponse()
+                    raw = resp.read()
+                except (http.client.RemoteDisconnected, ConnectionError, http.client.BadStatusLine):
+                    conn.close()
+                    if reused:
+                        continue
+                    raise
                 except Exception:
-                    parsed = None
-                return {'ok': True, 'status_code': getattr(resp, 'status', None) or None,
-                        'headers': resp_headers, 'text': text, 'json': parsed, 'error': None}
-        except urllib.error.HTTPError as he:
-            try:
-                body = he.read().decode('utf-8', errors='ignore')
-            except Exception:
-                body = ''
-            return {'ok': False, 'status_code': he.code, 'headers': {}, 'text': body, 'json': None, 'error': str(he)}
+                    conn.close()
+                    raise
+                break
+
+            if resp.will_close:
+                conn.close()
+            else:
+                self._conn_cache.checkin(parts.scheme, parts.netloc, verify, conn)
+
+            resp_headers = dict(resp.getheaders())
+            location = resp.getheader('Location')
+            if resp.status in _REDIRECT_CODES and location:
+                url = urllib.parse.urljoin(url, location)
+                if resp.status == 303 or (resp.status in (301, 302) and method == 'POST'):
+                    method, data_bytes = 'GET', None
+                continue
+
+            encoding = (resp.getheader('Content-Encoding') or '').lower()
+            if encoding == 'gzip':
+                raw = gzip.decompress(raw)
+            elif encoding == 'deflate':
+                raw = zlib.decompress(raw)
+            return resp.status, resp.reason, resp_headers, raw
+        raise urllib.error.URLError(f"Too many redirects for {url}")
+
+
+class AsyncAPIClient:
+    """Non-blocking counterpart of `APIClient` with the same result-dict contract.
+
+    One pooled `httpx.AsyncClient` is kept per SSL-verify setting. Without
+    httpx, requests go through a blocking `APIClient` on a worker thread so
+    the event loop still never waits on the network.
+    """
+
+    def __init__(self, verify: bool = True, default_headers: Optional[Dict[str, str]] = None,
+                 max_connections: int = 20, max_keepalive_connections: int = 10,
+                 sync_client: Optional[APIClient] = None):
+        self.verify = verify
+        self.default_headers = default_headers or {}
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self._clients: Dict[bool, Any] = {}
+        self._sync_client = sync_client
+
+    def _build_headers(self, headers: Optional[Dict[str, str]]):
+        h = dict(self.default_headers)
+        if headers:
+            h.update(headers)
+        return h
+
+    def _client_for(self, verify: bool):
+        client = self._clients.get(verify)
+        if client is None:
+            limits = httpx.Limits(max_connections=self.max_connections,
+                                  max_keepalive_connections=self.max_keepalive_connections)
+            client = httpx.AsyncClient(verify=verify, limits=limits, follow_redirects=True)
+            self._clients[verify] = client
+        return client
+
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None,
+                  timeout: int = 10, verify: Optional[bool] = None):
+        if params:
+            qs = urllib.parse.urlencode(params)
+            url = f"{url}?{qs}"
+        return await self._request('GET', url, None, headers, timeout, verify)
+
+    async def post(self, url: str, data: Optional[Any] = None, json_body: Optional[Any] = None,
+                   headers: Optional[Dict[str, str]] = None, timeout: int = 10, verify: Optional[bool] = None):
+        payload = json_body if json_body is not None else data
+        return await self._request('POST', url, payload, headers, timeout, verify)
+
+    async def put(self, url: str, data: Optional[Any] = None, json_body: Optional[Any] = None,
+                  headers: Optional[Dict[str, str]] = None, timeout: int = 10, verify: Optional[bool] = None):
+        payload = json_body if json_body is not None else data
+        return await self._request('PUT', url, payload, headers, timeout, verify)
+
+    async def patch(self, url: str, data: Optional[Any] = None, json_body: Optional[Any] = None,
+                    headers: Optional[Dict[str, str]] = None, timeout: int = 10, verify: Optional[bool] = None):
+        payload = json_body if json_body is not None else data
+        return await self._request('PATCH', url, payload, headers, timeout, verify)
+
+    async def _request(self, method: str, url: str, payload: Optional[Any], headers: Optional[Dict[str, str]],
+                       timeout: int, verify: Optional[bool]):
+        verify_final = self.verify if verify is None else bool(verify)
+
+        if httpx is None:
+            if self._sync_client is None:
+                self._sync_client = APIClient(verify=self.verify, default_headers=self.default_headers)
+            return await asyncio.to_thread(
+                self._sync_client._request, method, url, payload, headers, timeout, verify_final
+            )
+
+        hdrs = self._build_headers(headers)
+        try:
+            req_kwargs = dict(headers=hdrs, timeout=timeout)
+            if isinstance(payload, (dict, list)):
+                req_kwargs['json'] = payload
+            elif payload is not None:
+                # send raw payload as content
+                req_kwargs['content'] = payload if isinstance(payload, (str, bytes)) else str(payload)
+            r = await self._client_for(verify_final).request(method, url, **req_kwargs)
+            return APIResponse(
+                ok=r.status_code < 400,
+                status_code=r.status_code,
+                headers=dict(r.headers) if r.headers is not None else {},
+                content=r.content,
+                text_loader=lambda: r.text,
+            )
         except Exception as e:
             return {'ok': False, 'status_code': None, 'headers': {}, 'text': '', 'json': None, 'error': str(e)}
+
+    async def aclose(self) -> None:
+        """Close every pooled connection."""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
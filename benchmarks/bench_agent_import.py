@@ -0,0 +1,71 @@
+"""
+Import-time benchmark: `agent` with lazy provider SDKs vs the old eager imports.
+
+Each measurement is a fresh interpreter, so module caches do not carry over.
+"eager" imports `agent` plus every installed provider SDK, which is what the
+module paid before backends were loaded on first use.
+
+Run from the repository root:
+    python benchmarks/bench_agent_import.py [--repeat N] [--provider gemini]
+
+With --provider, also times creating that provider's backend (the cost is
+moved to the first Agent, not removed).
+"""
+
+import argparse
+import importlib.util
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SDK_MODULES = ["google.generativeai", "xai_sdk", "openai"]
+
+
+def _installed(name):
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def time_import(code, repeat):
+    """Median wall time in ms of running *code* in a new interpreter."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-W", "ignore", "-c", code], cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--provider', choices=["gemini", "xai", "openai", "azure"])
+    args = parser.parse_args()
+
+    sdks = [name for name in SDK_MODULES if _installed(name)]
+    cases = [
+        ("python startup", "pass"),
+        ("import agent (lazy)", "import agent"),
+        ("import agent + SDKs (eager)", "import agent; " + "; ".join(f"import {name}" for name in sdks)),
+    ]
+    if args.provider:
+        cases.append((f"import agent + load {args.provider}", f"import agent; agent.load_backend({args.provider!r})"))
+
+    print(f"installed SDKs: {', '.join(sdks) or 'none'}")
+    results = {}
+    for label, code in cases:
+        results[label] = time_import(code, args.repeat)
+        print(f"  {label:32s}: {results[label]:8.1f} ms")
+    lazy, eager = results["import agent (lazy)"], results["import agent + SDKs (eager)"]
+    print(f"  {'saved at startup':32s}: {eager - lazy:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
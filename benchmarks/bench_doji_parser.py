@@ -0,0 +1,84 @@
+"""
+Micro-benchmark: Doji table parsing, legacy inline regexes vs `doji_parser`.
+
+Run from the repository root:
+    python benchmarks/bench_doji_parser.py [fixture.dat ...] [--number N]
+
+Defaults to every file in benchmarks/fixtures/doji_*.dat.
+
+The legacy loop emits every matching row, `find_price_rows` only the first
+row per target, so results are compared target by target.
+"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from doji_parser import find_price_rows  # noqa: E402
+
+TARGETS = [
+    "SJC - Bán Lẻ",
+    "Nhẫn Tròn 9999 Hưng Thịnh Vượng - Bán Lẻ",
+]
+
+
+def legacy_parse(raw):
+    """The parsing loop `_fetch_doji_prices_struct` used before `doji_parser`."""
+    found = []
+    rows = re.findall(r'<tr[^>]*>.*?</tr>', raw, flags=re.S | re.I)
+    for tr in rows:
+        tds = re.findall(r'<td[^>]*>(.*?)</td>', tr, flags=re.S | re.I)
+        if not tds:
+            continue
+        clean = [re.sub(r'<.*?>', '', td).strip() for td in tds]
+        label = clean[0]
+        if any(label == t or t in label for t in TARGETS):
+            nums = []
+            for td in clean[1:]:
+                m = re.search(r'([0-9][0-9\.,]+)', td)
+                if m:
+                    nums.append(m.group(1))
+            found.append((label, nums))
+    return found
+
+
+def first_per_target(rows):
+    """Map each target to the first (label, numbers) row that matches it."""
+    return {t: next((row for row in rows if row[0] == t or t in row[0]), None) for t in TARGETS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('fixtures', nargs='*')
+    parser.add_argument('--number', type=int, default=2000)
+    args = parser.parse_args()
+
+    fixtures = args.fixtures or sorted(glob.glob(os.path.join(ROOT, 'benchmarks', 'fixtures', 'doji_*.dat')))
+    for path in fixtures:
+        with open(path, encoding='utf-8') as f:
+            raw = f.read()
+
+        expected, actual = first_per_target(legacy_parse(raw)), first_per_target(find_price_rows(raw, TARGETS))
+        if expected != actual:
+            print(f"{os.path.basename(path)}: parsers disagree")
+            for target in TARGETS:
+                if expected[target] != actual[target]:
+                    print(f"  {target}: legacy={expected[target]} doji_parser={actual[target]}")
+            continue
+
+        legacy = min(timeit.repeat(lambda: legacy_parse(raw), number=args.number, repeat=5)) / args.number
+        fast = min(timeit.repeat(lambda: find_price_rows(raw, TARGETS), number=args.number, repeat=5)) / args.number
+        print(f"{os.path.basename(path)} ({len(raw)} bytes)")
+        print(f"  legacy      : {legacy * 1e6:8.1f} us/parse")
+        print(f"  doji_parser : {fast * 1e6:8.1f} us/parse")
+        print(f"  speedup     : {legacy / fast:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
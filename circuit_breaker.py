@@ -0,0 +1,97 @@
+"""
+Retry policy and circuit breaker shared by the price providers.
+
+A provider that keeps failing is "opened" for a jittered, exponentially
+growing backoff. While open, calls fail fast without touching the network.
+Once the backoff expires a single half-open probe is let through: success
+closes the breaker, failure opens it again for longer. Nothing here sleeps;
+delayed retries simply happen on a later call.
+
+Usage:
+    breaker = CircuitBreaker("Mi Hong", RetryPolicy())
+    if breaker.allow():
+        ok = do_fetch()
+        breaker.record_success() if ok else breaker.record_failure()
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int = 2, failure_threshold: int = 2, base_delay: float = 10.0,
+                 max_delay: float = 300.0, jitter: float = 0.5):
+        # attempts per call, made back to back without sleeping
+        self.max_attempts = max(1, max_attempts)
+        # consecutive failed calls before the breaker opens
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def backoff(self, opened_count: int) -> float:
+        """Return how long to stay open after the breaker opened *opened_count* times in a row."""
+        delay = min(self.max_delay, self.base_delay * (2 ** max(0, opened_count - 1)))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, policy: Optional[RetryPolicy] = None):
+        self.name = name
+        self.policy = policy or RetryPolicy()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_count = 0
+        self.open_until = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Return True if a call may go through now (possibly as the half-open probe)."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() >= self.open_until:
+                self.state = self.HALF_OPEN
+                logging.info("CircuitBreaker %s: half-open, probing", self.name)
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                logging.info("CircuitBreaker %s: closed", self.name)
+            self.state = self.CLOSED
+            self.failures = 0
+            self.opened_count = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.policy.failure_threshold:
+                self.opened_count += 1
+                delay = self.policy.backoff(self.opened_count)
+                self.state = self.OPEN
+                self.open_until = time.monotonic() + delay
+                logging.warning("CircuitBreaker %s: open for %.1fs after %d failures",
+                                self.name, delay, self.failures)
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed (0 when closed)."""
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.open_until - time.monotonic())
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_in": self.retry_in(),
+        }
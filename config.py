@@ -10,6 +10,33 @@ except Exception:
 MONGO_URI = os.getenv("MONGO_URI", "")
 MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "Telegram_bot_database")
 MONGO_COLLECTION = os.getenv("MONGO_COLLECTION", "gold-price-collection")
+# Seconds a gold price snapshot is reused before providers are crawled again
+GOLD_SNAPSHOT_TTL = float(os.getenv("GOLD_SNAPSHOT_TTL", "60"))
+# Default seconds between polls of one gold provider
+GOLD_POLL_INTERVAL = float(os.getenv("GOLD_POLL_INTERVAL", "300"))
+# Per-provider overrides, e.g. "Mi Hong=30,Doji=1800"
+GOLD_POLL_INTERVALS = os.getenv("GOLD_POLL_INTERVALS", "")
+# Create the gold collection as a MongoDB time-series collection when possible
+GOLD_TIME_SERIES = os.getenv("GOLD_TIME_SERIES", "1").lower() not in ("0", "false", "no")
+# Write concern for gold price inserts: w ("majority" or a number) and journal.
+# Unset keeps the client's write concern (e.g. w=majority from the URI).
+GOLD_WRITE_CONCERN_W = os.getenv("GOLD_WRITE_CONCERN_W", "")
+GOLD_WRITE_CONCERN_J = os.getenv("GOLD_WRITE_CONCERN_J", "")
+# Optional collection with one gold-record summary per day (empty = disabled)
+GOLD_DAILY_STATS_COLLECTION = os.getenv("GOLD_DAILY_STATS_COLLECTION", "")
+# Opt-in cache of AI replies: max entries (0 = off), seconds to live, optional JSON file
+AGENT_CACHE_SIZE = int(os.getenv("AGENT_CACHE_SIZE", "0"))
+AGENT_CACHE_TTL = float(os.getenv("AGENT_CACHE_TTL", "600"))
+AGENT_CACHE_PATH = os.getenv("AGENT_CACHE_PATH", "")
+# Per-chat conversation memory: recent turns kept (0 = off) and token budget per request
+AGENT_MEMORY_TURNS = int(os.getenv("AGENT_MEMORY_TURNS", "10"))
+AGENT_MEMORY_TOKENS = int(os.getenv("AGENT_MEMORY_TOKENS", "1500"))
+# Let the AI call get_gold_price/get_money_rate, answered from the local caches
+AGENT_TOOLS = os.getenv("AGENT_TOOLS", "1").lower() not in ("0", "false", "no")
+# Seconds the parsed Eximbank rate table is reused before it is fetched again
+EXIMBANK_RATE_TTL = float(os.getenv("EXIMBANK_RATE_TTL", "300"))
+# Collection holding Eximbank rate history (one doc per currency change)
+EXIMBANK_RATE_COLLECTION = os.getenv("EXIMBANK_RATE_COLLECTION", "exchange-rate-collection")
 
 
 def get_mongo_uri() -> str:
@@ -22,3 +49,39 @@ def get_mongo_db_name() -> str:
 
 def get_mongo_collection() -> str:
     return MONGO_COLLECTION
+
+
+def get_gold_snapshot_ttl() -> float:
+    return GOLD_SNAPSHOT_TTL
+
+
+def get_gold_write_concern() -> dict:
+    """Keyword arguments for pymongo's WriteConcern used by gold price inserts.
+
+    Only the settings that are set are returned; empty means "inherit".
+    """
+    concern = {}
+    w = GOLD_WRITE_CONCERN_W.strip()
+    if w:
+        concern["w"] = int(w) if w.isdigit() else w
+    if GOLD_WRITE_CONCERN_J.strip():
+        concern["j"] = GOLD_WRITE_CONCERN_J.strip().lower() in ("1", "true", "yes")
+    return concern
+
+
+def get_eximbank_rate_ttl() -> float:
+    return EXIMBANK_RATE_TTL
+
+
+def get_gold_poll_intervals() -> dict:
+    """Parse GOLD_POLL_INTERVALS into {source_key: seconds} (keys lowercased, no spaces)."""
+    intervals = {}
+    for part in GOLD_POLL_INTERVALS.split(","):
+        name, sep, value = part.partition("=")
+        if not sep:
+            continue
+        try:
+            intervals["".join(name.split()).lower()] = float(value)
+        except ValueError:
+            continue
+    return intervals
@@ -0,0 +1,115 @@
+"""
+Bounded per-chat conversation memory for Agent.
+
+Each chat keeps its most recent turns in a ring buffer (`max_turns`) and a
+short running summary of older ones. Before every request the history is
+trimmed to `max_tokens` (estimated at ~4 characters per token): the oldest
+turns are folded into the summary, and the summary itself is cut to a
+quarter of the budget. Prompt size per turn therefore stays bounded however
+long a chat goes on. Only the `max_chats` most recently active chats are
+kept.
+
+The default summary is extractive (the start of each folded turn), so it
+costs no model call; pass `summarize` to use something smarter.
+
+Usage:
+    memory = ConversationMemory(max_turns=10, max_tokens=1500)
+    summary, turns = memory.context(chat_id)
+    ...
+    memory.add_turn(chat_id, prompt, reply)
+"""
+
+import threading
+from collections import OrderedDict, deque
+from typing import Callable, Deque, List, Optional, Tuple
+
+# (role, text) with role "user" or "assistant"
+Turn = Tuple[str, str]
+
+_SUMMARY_LINE_CHARS = 160
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) without a tokenizer."""
+    return len(text or "") // 4 + 1
+
+
+def extractive_summary(summary: str, turns: List[Turn]) -> str:
+    """Append the first line of each folded turn to *summary*."""
+    lines = [summary] if summary else []
+    for role, text in turns:
+        first = (text or "").strip().splitlines()[0] if (text or "").strip() else ""
+        if len(first) > _SUMMARY_LINE_CHARS:
+            first = first[:_SUMMARY_LINE_CHARS].rstrip() + "…"
+        lines.append(f"{'Người dùng' if role == 'user' else 'Bot'}: {first}")
+    return "\n".join(lines)
+
+
+class _ChatHistory:
+    def __init__(self):
+        self.turns: Deque[Turn] = deque()
+        self.summary = ""
+
+
+class ConversationMemory:
+    def __init__(self, max_turns: int = 10, max_tokens: int = 1500, max_chats: int = 1000,
+                 summarize: Optional[Callable[[str, List[Turn]], str]] = None):
+        # turns = one user message or one reply; a question and answer is two
+        self.max_turns = max(2, max_turns)
+        self.max_tokens = max_tokens
+        self.max_chats = max_chats
+        self.summarize = summarize or extractive_summary
+        self._chats: "OrderedDict[object, _ChatHistory]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def context(self, chat_id, prompt: str = "") -> Tuple[str, List[Turn]]:
+        """Return (summary, recent turns) for *chat_id*, trimmed so that they plus *prompt* fit the budget."""
+        with self._lock:
+            history = self._chats.get(chat_id)
+            if history is None:
+                return "", []
+            self._chats.move_to_end(chat_id)
+            self._trim(history, estimate_tokens(prompt))
+            return history.summary, list(history.turns)
+
+    def add_turn(self, chat_id, prompt: str, reply: str) -> None:
+        """Record a question and its reply for *chat_id*."""
+        with self._lock:
+            history = self._chats.get(chat_id)
+            if history is None:
+                history = self._chats[chat_id] = _ChatHistory()
+                while len(self._chats) > self.max_chats:
+                    self._chats.popitem(last=False)
+            self._chats.move_to_end(chat_id)
+            history.turns.append(("user", prompt))
+            history.turns.append(("assistant", reply))
+            if len(history.turns) > self.max_turns:
+                self._fold(history, len(history.turns) - self.max_turns)
+
+    def reset(self, chat_id) -> None:
+        with self._lock:
+            self._chats.pop(chat_id, None)
+
+    def __len__(self) -> int:
+        return len(self._chats)
+
+    def _fold(self, history: _ChatHistory, count: int) -> None:
+        """Move the *count* oldest turns into the summary."""
+        folded = [history.turns.popleft() for _ in range(min(count, len(history.turns)))]
+        if folded:
+            history.summary = self.summarize(history.summary, folded)
+        summary_budget = max(1, self.max_tokens // 4)
+        if estimate_tokens(history.summary) > summary_budget:
+            # keep the newest whole lines of the summary
+            lines = history.summary.splitlines()
+            while len(lines) > 1 and estimate_tokens("\n".join(lines)) > summary_budget:
+                lines.pop(0)
+            history.summary = "\n".join(lines)[-summary_budget * 4:]
+
+    def _trim(self, history: _ChatHistory, reserved: int) -> None:
+        while history.turns and self._size(history) + reserved > self.max_tokens:
+            self._fold(history, 2)
+
+    @staticmethod
+    def _size(history: _ChatHistory) -> int:
+        return estimate_tokens(history.summary) + sum(estimate_tokens(text) for _, text in history.turns)
@@ -1,27 +1,53 @@
-import json
+import copy
 import logging
 import re
+import threading
 import time
-from typing import Any, Dict, List, Optional, Protocol
-from config import MONGO_URI, MONGO_DB_NAME, MONGO_COLLECTION
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+from config import (MONGO_URI, MONGO_DB_NAME, MONGO_COLLECTION, GOLD_SNAPSHOT_TTL,
+                    GOLD_POLL_INTERVAL, GOLD_DAILY_STATS_COLLECTION, GOLD_TIME_SERIES,
+                    get_gold_poll_intervals, get_gold_write_concern)
+from db import PRICE_META_FIELD, ensure_price_collection, get_mongo_client, price_pair_fields
+from circuit_breaker import CircuitBreaker, RetryPolicy
+from doji_parser import find_price_rows
+from api_client import extract_json_array
 
 try:
-    from pymongo import MongoClient, DESCENDING
+    from pymongo import WriteConcern
+    from pymongo.errors import BulkWriteError
 except Exception:
-    MongoClient = None
-    DESCENDING = None
+    WriteConcern = None
+    BulkWriteError = None
+
+# A provider counts as due this close to its interval (5%, at least 1s), so
+# a poller ticking at that same interval is not pushed back a whole tick by
+# scheduling jitter.
+_POLL_SLACK_RATIO = 0.05
+_POLL_SLACK_MIN = 1.0
+
 
 class GoldPriceProvider(Protocol):
     name: str
+    # seconds between polls; results are reused in between
+    refresh_interval: Optional[float]
+    # seconds before a running fetch is reported as an error
+    timeout: Optional[float]
+    # lower values are listed first in snapshots and messages
+    priority: int
 
     def fetch(self) -> Dict[str, Any]:
         ...
 
 
 class _CallableGoldPriceProvider:
-    def __init__(self, name: str, fetch):
+    def __init__(self, name: str, fetch, refresh_interval: Optional[float] = None,
+                 timeout: Optional[float] = None, priority: int = 100):
         self.name = name
         self._fetch = fetch
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self.priority = priority
 
     def fetch(self) -> Dict[str, Any]:
         return self._fetch()
@@ -29,30 +55,152 @@ class _CallableGoldPriceProvider:
 
 class GoldPriceService:
     def __init__(self, api_client, mongo_uri: Optional[str] = None,
-                 db_name: str = MONGO_DB_NAME, collection: str = MONGO_COLLECTION):
+                 db_name: str = MONGO_DB_NAME, collection: str = MONGO_COLLECTION,
+                 parallel: bool = True, fetch_timeout: float = 30.0,
+                 snapshot_ttl: float = GOLD_SNAPSHOT_TTL, doji_cache_ttl: Optional[float] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 stats_collection: Optional[str] = GOLD_DAILY_STATS_COLLECTION,
+                 write_concern: Optional[Dict[str, Any]] = None):
         self.api_client = api_client
+        # Fetch all providers at once; each one gets `fetch_timeout` seconds
+        # (or its own `timeout` attribute) before it is reported as an error.
+        self.parallel = parallel
+        self.fetch_timeout = fetch_timeout
+        # Snapshots younger than `snapshot_ttl` seconds are served from memory;
+        # concurrent callers share the crawl that is already in flight.
+        self.snapshot_ttl = snapshot_ttl
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._snapshot_at = 0.0
+        self._snapshot_inflight: Optional[Future] = None
+        self._snapshot_lock = threading.Lock()
         self.mongo_client = None
         self.mongo_db = None
         self.mongo_coll = None
+        self.stats_coll = None
+        # Gold history is bucketed by {source, code} when the collection is time-series
+        self.time_series = False
+        self._source_field, self._code_field = price_pair_fields(False)
         effective_mongo_uri = mongo_uri if mongo_uri is not None else MONGO_URI
-        if MongoClient and effective_mongo_uri:
+        # Shared, pooled client: one per URI for the whole process
+        self.mongo_client = get_mongo_client(effective_mongo_uri)
+        if self.mongo_client is not None:
             try:
-                self.mongo_client = MongoClient(effective_mongo_uri, serverSelectionTimeoutMS=5000)
                 self.mongo_db = self.mongo_client[db_name]
                 self.mongo_coll = self.mongo_db[collection]
+                # Without explicit settings the client's write concern applies
+                concern = write_concern if write_concern is not None else get_gold_write_concern()
+                if WriteConcern is not None and concern:
+                    self.mongo_coll = self.mongo_coll.with_options(write_concern=WriteConcern(**concern))
+                if stats_collection:
+                    self.stats_coll = self.mongo_db[stats_collection]
             except Exception:
                 logging.exception('GoldPriceService: MongoDB connection failed')
                 self.mongo_client = None
                 self.mongo_db = None
                 self.mongo_coll = None
+        if self.mongo_coll is not None:
+            # A failed bootstrap (e.g. server briefly down) keeps the plain layout
+            try:
+                self.time_series = ensure_price_collection(self.mongo_db, collection, GOLD_TIME_SERIES)
+                self._source_field, self._code_field = price_pair_fields(self.time_series)
+            except Exception:
+                logging.exception('GoldPriceService: could not prepare collection %s', collection)
+
+        # Write-through cache of the last stored doc per (source_key, code),
+        # filled on demand for the pairs a snapshot needs (see
+        # `warm_price_cache` to load every pair up front). Once warmed, a
+        # missing key means "no history" and needs no DB read. Assumes this
+        # process is the only writer of the collection.
+        self._last_prices: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._last_prices_warmed = False
+        # Per-day baselines (first doc of today, last doc of yesterday) per pair
+        self._baselines: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._baseline_day = None
+        self._cache_lock = threading.Lock()
+
+        # Doji's table changes rarely: reuse the last parse on 304s, and
+        # within `doji_cache_ttl` seconds skip the request entirely.
+        self.doji_cache_ttl = doji_cache_ttl
+        self._doji_last_result: Optional[Dict[str, Any]] = None
+
+        # One circuit breaker per provider: a failing upstream fails fast
+        # until its jittered backoff expires, then gets a single probe.
+        self.retry_policy = retry_policy or RetryPolicy()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+        # Provider registry, kept sorted by priority. Each provider is polled
+        # on its own refresh interval (GOLD_POLL_INTERVALS overrides it) and
+        # its last good result is merged into every snapshot in between.
+        self.poll_interval_overrides = get_gold_poll_intervals()
+        self.providers: List[GoldPriceProvider] = []
+        self._live_results: Dict[str, Tuple[Dict[str, Any], float]] = {}
+        self.register_provider(_CallableGoldPriceProvider("Mi Hong", self._fetch_mihong_prices_struct, priority=10))
+        self.register_provider(_CallableGoldPriceProvider("Doji", self._fetch_doji_prices_struct, priority=20))
+        self.register_provider(_CallableGoldPriceProvider("Ngoc Tham", self._fetch_ngoctham_prices_struct, priority=30))
+
+    def register_provider(self, provider: GoldPriceProvider) -> None:
+        """Add *provider*, replacing any provider with the same name."""
+        name = getattr(provider, "name", "unknown")
+        providers = [p for p in self.providers if getattr(p, "name", None) != name]
+        providers.append(provider)
+        providers.sort(key=lambda p: getattr(p, "priority", 100))
+        self.providers = providers
+        with self._cache_lock:
+            self._live_results.pop(name, None)
+
+    def refresh_interval(self, provider: GoldPriceProvider) -> float:
+        """Seconds between polls of *provider*."""
+        override = self.poll_interval_overrides.get(self._source_key(getattr(provider, "name", "")))
+        if override is not None:
+            return override
+        interval = getattr(provider, "refresh_interval", None)
+        return GOLD_POLL_INTERVAL if interval is None else interval
+
+    def poll_interval(self) -> float:
+        """Shortest provider refresh interval: how often a poller should tick."""
+        intervals = [self.refresh_interval(p) for p in self.providers]
+        return min(intervals) if intervals else GOLD_POLL_INTERVAL
+
+    def get_snapshot(self, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """Return a gold price snapshot, crawling providers only when needed.
+
+        A cached snapshot is reused while it is younger than *max_age*
+        seconds (default: ``snapshot_ttl``, capped at ``poll_interval()``;
+        pass 0 to always build a new one). A new snapshot still only
+        fetches the providers that are due: the others contribute their
+        last good result, so a source's prices can be up to its refresh
+        interval old whatever *max_age* is. If a build is already running,
+        the caller waits for it instead of starting another one. The
+        returned dict is shared: treat it as read-only.
+        """
+        # Never serve a snapshot older than the fastest provider's cadence
+        ttl = min(self.snapshot_ttl, self.poll_interval()) if max_age is None else max_age
+        with self._snapshot_lock:
+            if self._snapshot is not None and ttl > 0 and time.monotonic() - self._snapshot_at <= ttl:
+                return self._snapshot
+            inflight = self._snapshot_inflight
+            owner = inflight is None
+            if owner:
+                inflight = self._snapshot_inflight = Future()
+
+        if not owner:
+            return inflight.result()
 
-        self.providers: List[GoldPriceProvider] = [
-            _CallableGoldPriceProvider("Mi Hong", self._fetch_mihong_prices_struct),
-            _CallableGoldPriceProvider("Doji", self._fetch_doji_prices_struct),
-            _CallableGoldPriceProvider("Ngoc Tham", self._fetch_ngoctham_prices_struct),
-        ]
+        try:
+            snapshot = self._build_snapshot()
+        except BaseException as exc:
+            with self._snapshot_lock:
+                self._snapshot_inflight = None
+            inflight.set_exception(exc)
+            raise
+        with self._snapshot_lock:
+            self._snapshot = snapshot
+            self._snapshot_at = time.monotonic()
+            self._snapshot_inflight = None
+        inflight.set_result(snapshot)
+        return snapshot
 
-    def get_snapshot(self) -> Dict[str, Any]:
+    def _build_snapshot(self) -> Dict[str, Any]:
         as_of_dt = time.strftime("%Y-%m-%dT%H:%M:%S%z")
         snapshot = {
             "as_of": as_of_dt,
@@ -62,37 +210,27 @@ class GoldPriceService:
             "note": "Trao niem tin nhan tai loc.",
         }
 
-        for provider in self.providers:
-            try:
-                result = provider.fetch()
-            except Exception as exc:
-                result = {
-                    "name": getattr(provider, "name", "unknown"),
-                    "status": "error",
-                    "error": str(exc),
-                    "raw": None,
-                    "items": [],
-                }
-
+        results = self._fetch_all_providers()
+        # One aggregation covers the baselines and last stored doc of every
+        # (source, code) pair in this snapshot; changes are computed in memory.
+        context = self._load_price_context(
+            (result.get("name"), item.get("code"))
+            for result in results if result.get("status") == "ok"
+            for item in result.get("items", [])
+        )
+
+        changed_items = []
+        for result in results:
             if result.get("status") == "ok":
                 # Apply change detection and computation for each item
                 has_any_change = False
                 for item in result.get("items", []):
-                    self._apply_db_change(result.get("name"), item)
+                    self._apply_db_change(result.get("name"), item, context)
                     
                     # has_price_change is based on baseline comparison (for display)
                     if item.get("has_price_change", False):
                         has_any_change = True
-                    
-                    # Store to DB if price changed from last stored value
-                    # (insert_if_changed handles the check internally)
-                    self.insert_if_changed(
-                        result.get("name"),
-                        item.get("code"),
-                        item.get("buyPrice"),
-                        item.get("sellPrice"),
-                        item.get("dateTime"),
-                    )
+                        changed_items.append((result.get("name"), item))
                 
                 # Add source-level change flag
                 result["has_any_change"] = has_any_change
@@ -103,9 +241,111 @@ class GoldPriceService:
 
             snapshot["sources"].append(result)
 
+        # Changed prices of the whole snapshot go to the DB in one round trip
+        report = self.store_price_changes(changed_items)
+        snapshot["store_errors"] = [entry for entry in report if not entry["ok"]]
+
         snapshot["message"] = self._format_gold_price_message(snapshot)
         return snapshot
 
+    def _provider_error(self, provider, error: str) -> Dict[str, Any]:
+        return {
+            "name": getattr(provider, "name", "unknown"),
+            "status": "error",
+            "error": error,
+            "raw": None,
+            "items": [],
+        }
+
+    def _breaker_for(self, provider) -> CircuitBreaker:
+        name = getattr(provider, "name", "unknown")
+        with self._cache_lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = self._breakers[name] = CircuitBreaker(name, self.retry_policy)
+            return breaker
+
+    def _fetch_provider(self, provider) -> Dict[str, Any]:
+        breaker = self._breaker_for(provider)
+        if not breaker.allow():
+            return self._provider_error(
+                provider, f"Tam ngung goi nguon nay, thu lai sau {breaker.retry_in():.0f}s."
+            )
+        try:
+            result = provider.fetch()
+        except Exception as exc:
+            result = self._provider_error(provider, str(exc))
+        if result.get("status") == "ok":
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+        return result
+
+    def provider_health(self) -> Dict[str, Dict[str, Any]]:
+        """Return the circuit breaker state of every provider that has been called."""
+        with self._cache_lock:
+            breakers = list(self._breakers.values())
+        return {breaker.name: breaker.snapshot() for breaker in breakers}
+
+    def _fetch_all_providers(self) -> List[Dict[str, Any]]:
+        """Return one result per provider, in provider order.
+
+        Only providers whose refresh interval has (nearly) elapsed are
+        fetched; the others contribute a copy of their last good result.
+        """
+        providers = list(self.providers)
+        now = time.monotonic()
+        with self._cache_lock:
+            live = dict(self._live_results)
+        due = [provider for provider in providers if provider.name not in live
+               or self._is_due(provider, now - live[provider.name][1])]
+        fetched = dict(zip((provider.name for provider in due), self._fetch_providers(due)))
+
+        results = []
+        for provider in providers:
+            result = fetched.get(provider.name)
+            if result is None:
+                result = copy.deepcopy(live[provider.name][0])
+            elif result.get("status") == "ok":
+                with self._cache_lock:
+                    self._live_results[provider.name] = (copy.deepcopy(result), now)
+            results.append(result)
+        return results
+
+    def _is_due(self, provider: GoldPriceProvider, age: float) -> bool:
+        interval = self.refresh_interval(provider)
+        return age >= interval - max(_POLL_SLACK_MIN, interval * _POLL_SLACK_RATIO)
+
+    def _fetch_providers(self, providers: List[GoldPriceProvider]) -> List[Dict[str, Any]]:
+        """Fetch *providers* and return the results in the same order.
+
+        In parallel mode all providers run at once on a short-lived thread
+        pool, so the total latency tracks the slowest provider instead of
+        the sum of all of them. A provider that misses its deadline is
+        reported as an error; its worker thread is left to finish on its own.
+        """
+        if not self.parallel or len(providers) <= 1:
+            return [self._fetch_provider(provider) for provider in providers]
+
+        executor = ThreadPoolExecutor(
+            max_workers=len(providers), thread_name_prefix="gold-fetch"
+        )
+        try:
+            started = time.monotonic()
+            futures = [executor.submit(self._fetch_provider, provider) for provider in providers]
+            results = []
+            for provider, future in zip(providers, futures):
+                timeout = getattr(provider, "timeout", None) or self.fetch_timeout
+                remaining = max(0.0, started + timeout - time.monotonic())
+                try:
+                    results.append(future.result(timeout=remaining))
+                except FutureTimeoutError:
+                    logging.warning("Provider %s timed out after %.1fs", getattr(provider, "name", "unknown"), timeout)
+                    results.append(self._provider_error(provider, f"Het thoi gian cho ({timeout:.0f}s)."))
+            return results
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
     def _format_gold_price_message(self, snapshot: Dict[str, Any]) -> str:
         """Format gold price message grouped by provider."""
         lines: List[str] = []
@@ -214,6 +454,213 @@ class GoldPriceService:
     def _source_key(self, source: Optional[str]) -> str:
         return re.sub(r"\s+", "", (source or "")).lower()
 
+    def _pair_filter(self, src_key: str, code: str) -> Dict[str, Any]:
+        """Query matching one (source_key, code) pair on the indexed fields."""
+        return {self._source_field: src_key, self._code_field: code}
+
+    def _pair_group_id(self) -> Dict[str, str]:
+        """`$group` key for (source, code) on the indexed (meta) fields."""
+        return {"source": "$" + self._source_field, "code": "$" + self._code_field}
+
+    def warm_price_cache(self) -> bool:
+        """Load the last stored doc of every (source, code) pair into memory.
+
+        Not called automatically: it reads the whole collection, while
+        snapshots only load the pairs they need. Returns True when the cache
+        was warmed. On failure the cache keeps working read-through.
+        """
+        if self.mongo_coll is None:
+            return False
+        try:
+            rows = self.mongo_coll.aggregate([
+                {"$sort": {self._source_field: 1, self._code_field: 1, "timestamp": -1}},
+                {"$group": {
+                    "_id": self._pair_group_id(),
+                    "doc": {"$first": {"timestamp": "$timestamp", "buy": "$buy", "sell": "$sell"}},
+                }},
+            ])
+            last_prices = {(row["_id"].get("source"), row["_id"].get("code")): row.get("doc") for row in rows}
+            with self._cache_lock:
+                self._last_prices = last_prices
+                self._last_prices_warmed = True
+            logging.info("GoldPriceService: warmed price cache with %d pairs", len(last_prices))
+            return True
+        except Exception:
+            logging.exception("GoldPriceService: failed to warm price cache")
+            return False
+
+    def _cached_last_doc(self, src_key: str, code: str):
+        """Return (hit, doc) for the last stored doc of a pair from the cache."""
+        with self._cache_lock:
+            key = (src_key, code)
+            if key in self._last_prices:
+                return True, self._last_prices[key]
+            if self._last_prices_warmed:
+                return True, None
+            return False, None
+
+    def _remember_last_doc(self, src_key: str, code: str, doc: Optional[Dict[str, Any]]) -> None:
+        if doc is None:
+            return
+        with self._cache_lock:
+            self._last_prices[(src_key, code)] = {
+                "timestamp": doc.get("timestamp"),
+                "buy": doc.get("buy"),
+                "sell": doc.get("sell"),
+            }
+
+    @staticmethod
+    def _vn_now():
+        """Return the current time in Hanoi (GMT+7) as an aware datetime."""
+        import datetime as dt_module
+        try:
+            from zoneinfo import ZoneInfo
+            return dt_module.datetime.now(ZoneInfo('Asia/Ho_Chi_Minh'))
+        except Exception:
+            return dt_module.datetime.now(dt_module.timezone(dt_module.timedelta(hours=7)))
+
+    def _day_bounds(self):
+        """Return (today_start, yesterday_start) at Asia/Ho_Chi_Minh midnight."""
+        import datetime as dt_module
+        today_start = self._vn_now().replace(hour=0, minute=0, second=0, microsecond=0)
+        return today_start, today_start - dt_module.timedelta(days=1)
+
+    def _daily_baselines(self, keys) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """Return ``today_first``/``yesterday_last`` docs for (source_key, code) pairs.
+
+        Baselines are constant for a whole day, so each pair is loaded once
+        per day (misses share one aggregation) and the cache is dropped at
+        the Asia/Ho_Chi_Minh midnight boundary. Raises on query failure.
+        """
+        today_start, yesterday_start = self._day_bounds()
+        with self._cache_lock:
+            if self._baseline_day != today_start.date():
+                self._baselines = {}
+                self._baseline_day = today_start.date()
+            missing = [key for key in keys if key not in self._baselines]
+
+        if missing and self.mongo_coll is not None:
+            loaded = {key: {"today_first": None, "yesterday_last": None} for key in missing}
+            doc_fields = {"timestamp": "$timestamp", "buy": "$buy", "sell": "$sell"}
+            rows = self.mongo_coll.aggregate([
+                {"$match": {
+                    "$or": [self._pair_filter(src_key, code) for src_key, code in missing],
+                    "timestamp": {"$gte": yesterday_start},
+                }},
+                {"$sort": {"timestamp": 1}},
+                {"$group": {
+                    "_id": {
+                        **self._pair_group_id(),
+                        "today": {"$gte": ["$timestamp", today_start]},
+                    },
+                    "first": {"$first": doc_fields},
+                    "last": {"$last": doc_fields},
+                }},
+            ])
+            for row in rows:
+                group = row["_id"]
+                entry = loaded.get((group.get("source"), group.get("code")))
+                if entry is None:
+                    continue
+                if group.get("today"):
+                    entry["today_first"] = row.get("first")
+                else:
+                    entry["yesterday_last"] = row.get("last")
+            with self._cache_lock:
+                if self._baseline_day == today_start.date():
+                    for key, entry in loaded.items():
+                        self._baselines.setdefault(key, entry)
+
+        with self._cache_lock:
+            return {
+                key: dict(self._baselines.get(key) or {"today_first": None, "yesterday_last": None})
+                for key in keys
+            }
+
+    def _remember_baseline(self, src_key: str, code: str, doc: Dict[str, Any]) -> None:
+        """Use the first insert of the day as today's baseline for the pair."""
+        today = self._day_bounds()[0].date()
+        with self._cache_lock:
+            entry = self._baselines.get((src_key, code))
+            if self._baseline_day != today or entry is None or entry.get("today_first") is not None:
+                return
+            entry["today_first"] = {
+                "timestamp": doc.get("timestamp"),
+                "buy": doc.get("buy"),
+                "sell": doc.get("sell"),
+            }
+
+    def _load_price_context(self, pairs) -> Optional[Dict[Tuple[str, str], Dict[str, Any]]]:
+        """Load baseline and last stored docs for many (source, code) pairs at once.
+
+        Returns a dict keyed by (source_key, code) with ``today_first``,
+        ``yesterday_last`` and ``latest`` docs (each may be None), or None when
+        MongoDB is unavailable or the query failed. Baselines come from the
+        daily cache and the last stored doc from the price cache; misses are
+        filled with at most one grouped aggregation each, so a steady-state
+        tick makes no DB reads.
+        """
+        if self.mongo_coll is None:
+            return None
+        keys = sorted({(self._source_key(source), code) for source, code in pairs if code})
+        if not keys:
+            return {}
+        try:
+            context: Dict[Tuple[str, str], Dict[str, Any]] = self._daily_baselines(keys)
+
+            missing = []
+            for (src_key, code), ctx in context.items():
+                hit, cached = self._cached_last_doc(src_key, code)
+                ctx["latest"] = cached
+                if not hit:
+                    missing.append(self._pair_filter(src_key, code))
+            if missing:
+                latest = self.mongo_coll.aggregate([
+                    {"$match": {"$or": missing}},
+                    {"$sort": {self._source_field: 1, self._code_field: 1, "timestamp": -1}},
+                    {"$group": {
+                        "_id": self._pair_group_id(),
+                        "doc": {"$first": {"timestamp": "$timestamp", "buy": "$buy", "sell": "$sell"}},
+                    }},
+                ])
+                for row in latest:
+                    key = (row["_id"].get("source"), row["_id"].get("code"))
+                    ctx = context.get(key)
+                    if ctx is not None:
+                        ctx["latest"] = row.get("doc")
+                        self._remember_last_doc(key[0], key[1], ctx["latest"])
+            return context
+        except Exception:
+            logging.exception("Failed loading price context for %d pairs", len(keys))
+            return None
+
+    def _price_change_from(self, source: str, code: str, baseline_doc: Optional[Dict[str, Any]],
+                           current_price: Optional[int], price_type: str) -> Optional[int]:
+        if current_price is None:
+            logging.debug("Current price is None for %s/%s %s", source, code, price_type)
+            return None
+        if not baseline_doc:
+            logging.info("No baseline data found for %s/%s - first time collecting", source, code)
+            return None
+
+        baseline_price = baseline_doc.get(price_type)
+        if baseline_price is None:
+            logging.warning("Baseline doc exists but %s is None for %s/%s", price_type, source, code)
+            return None
+
+        change = current_price - baseline_price
+        logging.info(
+            "Computed %s change for %s/%s: %d - %d (baseline: %s) = %d",
+            price_type,
+            source,
+            code,
+            current_price,
+            baseline_price,
+            baseline_doc.get('timestamp', 'unknown'),
+            change,
+        )
+        return change
+
     def _compute_price_change(self, source: str, code: str, current_price: Optional[int], price_type: str) -> Optional[int]:
         """Compute price change vs. baseline price (first price of the day) in MongoDB."""
         if self.mongo_coll is None:
@@ -223,60 +670,34 @@ class GoldPriceService:
             logging.debug("Current price is None for %s/%s %s", source, code, price_type)
             return None
         try:
-            import datetime as dt_module
-            src_key = self._source_key(source)
-            
-            # Get the start of today (00:00:00)
-            today_start = dt_module.datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-            
-            # Find the FIRST (oldest) price recorded today as baseline
-            baseline_doc = self.mongo_coll.find_one(
-                {
-                    "source": src_key,
-                    "code": code,
-                    "timestamp": {"$gte": today_start}
-                },
-                sort=[("timestamp", 1)],  # Ascending - get FIRST of day
-            )
-            
-            if not baseline_doc:
-                # No data today yet, try to get yesterday's last price as baseline
-                yesterday_start = today_start - dt_module.timedelta(days=1)
-                baseline_doc = self.mongo_coll.find_one(
-                    {
-                        "source": src_key,
-                        "code": code,
-                        "timestamp": {"$gte": yesterday_start, "$lt": today_start}
-                    },
-                    sort=[("timestamp", -1)],  # Descending - get last of yesterday
-                )
-            
-            if not baseline_doc:
-                logging.info("No baseline data found for %s/%s (source_key=%s) - first time collecting", source, code, src_key)
-                return None
-                
-            baseline_price = baseline_doc.get(price_type)
-            if baseline_price is None:
-                logging.warning("Baseline doc exists but %s is None for %s/%s", price_type, source, code)
-                return None
-                
-            change = current_price - baseline_price
-            baseline_time = baseline_doc.get('timestamp', 'unknown')
-            logging.info(
-                "Computed %s change for %s/%s: %d - %d (baseline: %s) = %d",
-                price_type,
-                source,
-                code,
-                current_price,
-                baseline_price,
-                baseline_time,
-                change,
-            )
-            return change
+            key = (self._source_key(source), code)
+            baselines = self._daily_baselines([key])[key]
+            # First price of today, else yesterday's last price
+            baseline_doc = baselines.get("today_first") or baselines.get("yesterday_last")
+            return self._price_change_from(source, code, baseline_doc, current_price, price_type)
         except Exception:
             logging.exception("Failed computing price change for %s/%s", source, code)
             return None
 
+    @staticmethod
+    def _differs_from_last(last_doc: Optional[Dict[str, Any]], buy_price: Optional[int],
+                           sell_price: Optional[int]) -> bool:
+        """Return True if buy/sell differ from *last_doc* (or there is no history)."""
+        if buy_price is None and sell_price is None:
+            return False
+        if not last_doc:
+            return True
+
+        last_buy = last_doc.get("buy")
+        last_sell = last_doc.get("sell")
+
+        if buy_price is not None and (last_buy is None or buy_price != last_buy):
+            return True
+        if sell_price is not None and (last_sell is None or sell_price != last_sell):
+            return True
+
+        return False
+
     def _check_price_change(
         self,
         source: str,
@@ -291,22 +712,14 @@ class GoldPriceService:
             return True
         try:
             src_key = self._source_key(source)
-            last_doc = self.mongo_coll.find_one(
-                {"source": src_key, "code": code},
-                sort=[("timestamp", -1)],
-            )
-            if not last_doc:
-                return True
-
-            last_buy = last_doc.get("buy")
-            last_sell = last_doc.get("sell")
-
-            if buy_price is not None and (last_buy is None or buy_price != last_buy):
-                return True
-            if sell_price is not None and (last_sell is None or sell_price != last_sell):
-                return True
-
-            return False
+            hit, last_doc = self._cached_last_doc(src_key, code)
+            if not hit:
+                last_doc = self.mongo_coll.find_one(
+                    self._pair_filter(src_key, code),
+                    sort=[("timestamp", -1)],
+                )
+                self._remember_last_doc(src_key, code, last_doc)
+            return self._differs_from_last(last_doc, buy_price, sell_price)
         except Exception:
             logging.exception("Failed checking price change for %s/%s", source, code)
             return True
@@ -318,9 +731,13 @@ class GoldPriceService:
         buy_price: Optional[int],
         sell_price: Optional[int],
         datetime_str: Optional[str] = None,
+        changed: Optional[bool] = None,
     ) -> bool:
         """Insert a new price document only if the price changed.
 
+        *changed* can carry a change check the caller already made (e.g. from
+        a batched price context) so no extra lookup is issued.
+
         Returns:
             True if price changed and was inserted, False otherwise
         """
@@ -332,50 +749,111 @@ class GoldPriceService:
             logging.debug("Skipping insert for %s/%s: both prices are None", source, code)
             return False
 
-        if not self._check_price_change(source, code, buy_price, sell_price):
+        if changed is None:
+            changed = self._check_price_change(source, code, buy_price, sell_price)
+        if not changed:
             logging.info("No price change for %s/%s, skipping insert", source, code)
             return False
 
         try:
-            import datetime as dt_module
-            if datetime_str:
-                try:
-                    timestamp = dt_module.datetime.fromisoformat(datetime_str)
-                except Exception:
-                    timestamp = dt_module.datetime.utcnow()
-            else:
-                timestamp = dt_module.datetime.utcnow()
-
-            src_key = self._source_key(source)
-            doc = {
-                "timestamp": timestamp,
-                "source": src_key,
-                "code": code,
-                "buy": buy_price,
-                "sell": sell_price,
-                "source_display": source,
-            }
-
+            doc = self._price_doc(source, code, buy_price, sell_price, datetime_str)
             self.mongo_coll.insert_one(doc)
+            self._remember_stored(doc)
             logging.info(
                 "Stored price change for %s/%s: buy=%s sell=%s at %s",
                 source,
                 code,
                 buy_price,
                 sell_price,
-                timestamp,
+                doc["timestamp"],
             )
             return True
         except Exception as e:
             logging.exception("Error inserting price for %s/%s: %s", source, code, e)
             return False
 
-    def _apply_db_change(self, source: str, item: Dict[str, Any]) -> None:
+    def store_price_changes(self, changed_items) -> List[Dict[str, Any]]:
+        """Insert the prices of *changed_items* with one unordered insert_many.
+
+        *changed_items* holds ``(source, item)`` pairs whose change check was
+        already done. Returns one entry per item with keys source, code,
+        ok and error; caches are only updated for documents that were written.
+        Each attempted item also gets a ``stored`` flag.
+        """
+        if self.mongo_coll is None:
+            return []
+        entries = []
+        docs = []
+        for source, item in changed_items:
+            code = item.get("code")
+            if item.get("buyPrice") is None and item.get("sellPrice") is None:
+                logging.debug("Skipping insert for %s/%s: both prices are None", source, code)
+                continue
+            entry = {"source": source, "code": code, "ok": False, "error": None}
+            entries.append(entry)
+            docs.append((entry, item, self._price_doc(source, code, item.get("buyPrice"),
+                                                        item.get("sellPrice"), item.get("dateTime"))))
+
+        if docs:
+            failed: Dict[int, str] = {}
+            try:
+                self.mongo_coll.insert_many([doc for _, _, doc in docs], ordered=False)
+            except Exception as e:
+                details = getattr(e, "details", None) if BulkWriteError is not None and isinstance(e, BulkWriteError) else None
+                if details is not None:
+                    failed = {err.get("index"): err.get("errmsg", str(e)) for err in details.get("writeErrors", [])}
+                    # Write concern errors leave the outcome of the batch unknown
+                    if details.get("writeConcernErrors"):
+                        failed = {index: str(e) for index in range(len(docs))}
+                else:
+                    failed = {index: str(e) for index in range(len(docs))}
+                logging.error("Failed storing %d/%d price changes: %s", len(failed), len(docs), e)
+
+            for index, (entry, item, doc) in enumerate(docs):
+                if index in failed:
+                    entry["error"] = failed[index]
+                else:
+                    entry["ok"] = True
+                    self._remember_stored(doc)
+                item["stored"] = entry["ok"]
+            logging.info("Stored %d/%d price changes", len(docs) - len(failed), len(docs))
+        return entries
+
+    def _price_doc(self, source: str, code: str, buy_price: Optional[int], sell_price: Optional[int],
+                   datetime_str: Optional[str] = None) -> Dict[str, Any]:
+        import datetime as dt_module
+        if datetime_str:
+            try:
+                timestamp = dt_module.datetime.fromisoformat(datetime_str)
+            except Exception:
+                timestamp = dt_module.datetime.utcnow()
+        else:
+            timestamp = dt_module.datetime.utcnow()
+
+        src_key = self._source_key(source)
+        return {
+            "timestamp": timestamp,
+            "source": src_key,
+            "code": code,
+            "buy": buy_price,
+            "sell": sell_price,
+            "source_display": source,
+            PRICE_META_FIELD: {"source": src_key, "code": code},
+        }
+
+    def _remember_stored(self, doc: Dict[str, Any]) -> None:
+        self._remember_last_doc(doc["source"], doc["code"], doc)
+        self._remember_baseline(doc["source"], doc["code"], doc)
+
+    def _apply_db_change(self, source: str, item: Dict[str, Any],
+                         context: Optional[Dict[Tuple[str, str], Dict[str, Any]]] = None) -> None:
         code = item.get('code')
         if not code:
             return
         buy_price = item.get('buyPrice')
         sell_price = item.get('sellPrice')
+        # Prefetched docs from _load_price_context; None falls back to per-item queries
+        ctx = context.get((self._source_key(source), code)) if context is not None else None
         
         # Prioritize API-provided changes first
         api_buy_change = item.get('buyChange')
@@ -385,14 +863,21 @@ class GoldPriceService:
                      source, code, api_buy_change, api_sell_change)
         
         # If API didn't provide changes, compute from DB baseline
-        if api_buy_change is None:
-            computed_buy = self._compute_price_change(source, code, buy_price, 'buy')
-            item['buyChange'] = computed_buy
-            logging.debug("Computed buy change for %s/%s: %s", source, code, computed_buy)
-        if api_sell_change is None:
-            computed_sell = self._compute_price_change(source, code, sell_price, 'sell')
-            item['sellChange'] = computed_sell
-            logging.debug("Computed sell change for %s/%s: %s", source, code, computed_sell)
+        if ctx is not None:
+            baseline_doc = ctx.get('today_first') or ctx.get('yesterday_last')
+            if api_buy_change is None:
+                item['buyChange'] = self._price_change_from(source, code, baseline_doc, buy_price, 'buy')
+            if api_sell_change is None:
+                item['sellChange'] = self._price_change_from(source, code, baseline_doc, sell_price, 'sell')
+        else:
+            if api_buy_change is None:
+                computed_buy = self._compute_price_change(source, code, buy_price, 'buy')
+                item['buyChange'] = computed_buy
+                logging.debug("Computed buy change for %s/%s: %s", source, code, computed_buy)
+            if api_sell_change is None:
+                computed_sell = self._compute_price_change(source, code, sell_price, 'sell')
+                item['sellChange'] = computed_sell
+                logging.debug("Computed sell change for %s/%s: %s", source, code, computed_sell)
         
         item['change'] = {
             'buy': item.get('buyChange'),
@@ -401,20 +886,22 @@ class GoldPriceService:
         
         # CRITICAL: has_price_change must check against LAST STORED value (not baseline)
         # This ensures "changes" command only shows NEW changes, not repeated baseline diffs
-        item['has_price_change'] = self._check_price_change(source, code, buy_price, sell_price)
+        if ctx is not None:
+            item['has_price_change'] = self._differs_from_last(ctx.get('latest'), buy_price, sell_price)
+        else:
+            item['has_price_change'] = self._check_price_change(source, code, buy_price, sell_price)
 
     def _fetch_mihong_prices_struct(self):
         url = "https://api.mihong.vn/v1/gold-prices?market=domestic"
         headers = {}
-        max_retries = 5
+        # Immediate retries only; longer backoff is the circuit breaker's job
+        max_retries = self.retry_policy.max_attempts
         resp = None
         for attempt in range(1, max_retries + 1):
             resp = self.api_client.get(url, headers=headers, timeout=10, verify=False)
             if resp.get('ok'):
                 break
             logging.warning("Mi Hong API request failed (attempt %d/%d): %s", attempt, max_retries, resp.get('error'))
-            if attempt < max_retries:
-                time.sleep(attempt)
         else:
             return {
                 "name": "Mi Hong",
@@ -424,29 +911,17 @@ class GoldPriceService:
                 "items": [],
             }
 
-        parsed = resp.get('json')
-        text = resp.get('text', '')
-
-        data_list = None
-        if isinstance(parsed, dict):
-            if 'data' in parsed and isinstance(parsed['data'], list):
-                data_list = parsed['data']
-            else:
+        # Decode only the "data" array; parse the whole body only if it is missing
+        data_list = extract_json_array(resp, 'data')
+        if data_list is None:
+            parsed = resp.get('json')
+            if isinstance(parsed, dict):
                 for v in parsed.values():
                     if isinstance(v, list):
                         data_list = v
                         break
-        elif isinstance(parsed, list):
-            data_list = parsed
-        else:
-            try:
-                j = json.loads(text)
-                if isinstance(j, dict) and 'data' in j and isinstance(j['data'], list):
-                    data_list = j['data']
-                elif isinstance(j, list):
-                    data_list = j
-            except Exception:
-                pass
+            elif isinstance(parsed, list):
+                data_list = parsed
 
         if not data_list:
             return {
@@ -534,7 +1009,7 @@ class GoldPriceService:
     def _fetch_doji_prices_struct(self):
         doji_url = "https://giavang.doji.vn/sites/default/files/data/hienthi/vungmien_109.dat"
         try:
-            resp2 = self.api_client.get(doji_url, timeout=10, verify=False)
+            resp2 = self.api_client.get(doji_url, timeout=10, verify=False, cache_ttl=self.doji_cache_ttl)
         except Exception as e:
             return {
                 "name": "Doji",
@@ -553,6 +1028,15 @@ class GoldPriceService:
                 "items": [],
             }
 
+        # Unchanged file (304 or within the TTL): reuse the last parsed result
+        if resp2.get('not_modified') and self._doji_last_result is not None:
+            logging.info('Doji: data unchanged, skipping parse')
+            result = copy.deepcopy(self._doji_last_result)
+            as_of_dt = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+            for item in result["items"]:
+                item["dateTime"] = as_of_dt
+            return result
+
         raw = (resp2.get('text') or '')
         if not raw.strip():
             return {
@@ -571,7 +1055,6 @@ class GoldPriceService:
             return None
 
         try:
-            rows = re.findall(r'<tr[^>]*>.*?</tr>', raw, flags=re.S | re.I)
             targets = [
                 "SJC - Bán Lẻ",
                 "Nhẫn Tròn 9999 Hưng Thịnh Vượng - Bán Lẻ",
@@ -579,46 +1062,35 @@ class GoldPriceService:
             as_of_dt = time.strftime("%Y-%m-%dT%H:%M:%S%z")
             raw_items = []
             items = []
-            for tr in rows:
-                tds = re.findall(r'<td[^>]*>(.*?)</td>', tr, flags=re.S | re.I)
-                if not tds:
-                    continue
-                clean = [re.sub(r'<.*?>', '', td).strip() for td in tds]
-                label = clean[0]
-                if any(label == t or t in label for t in targets):
-                    nums = []
-                    for td in clean[1:]:
-                        m = re.search(r'([0-9][0-9\.,]+)', td)
-                        if m:
-                            nums.append(m.group(1))
-                    buy = nums[0] if len(nums) > 0 else 'N/A'
-                    sell = nums[1] if len(nums) > 1 else ('N/A' if len(nums) > 0 else 'N/A')
-                    buy_price_raw = self._parse_price(buy)
-                    sell_price_raw = self._parse_price(sell)
-                    # Doji prices need to be multiplied by 1000
-                    buy_price = buy_price_raw * 1000 if buy_price_raw else None
-                    sell_price = sell_price_raw * 1000 if sell_price_raw else None
-                    code = map_code(label)
-
-                    logging.info('Doji %s: buy=%s sell=%s (raw: %s/%s) from label=%s', 
-                                code, buy_price, sell_price, buy_price_raw, sell_price_raw, label)
-
-                    raw_items.append({
-                        "label": label,
-                        "buyingPrice": buy_price,
-                        "sellingPrice": sell_price,
+            for label, nums in find_price_rows(raw, targets):
+                buy = nums[0] if len(nums) > 0 else 'N/A'
+                sell = nums[1] if len(nums) > 1 else ('N/A' if len(nums) > 0 else 'N/A')
+                buy_price_raw = self._parse_price(buy)
+                sell_price_raw = self._parse_price(sell)
+                # Doji prices need to be multiplied by 1000
+                buy_price = buy_price_raw * 1000 if buy_price_raw else None
+                sell_price = sell_price_raw * 1000 if sell_price_raw else None
+                code = map_code(label)
+
+                logging.info('Doji %s: buy=%s sell=%s (raw: %s/%s) from label=%s', 
+                            code, buy_price, sell_price, buy_price_raw, sell_price_raw, label)
+
+                raw_items.append({
+                    "label": label,
+                    "buyingPrice": buy_price,
+                    "sellingPrice": sell_price,
+                })
+
+                if code:
+                    items.append({
+                        "source": "Doji",
+                        "code": code,
+                        "buyPrice": buy_price,
+                        "sellPrice": sell_price,
+                        "dateTime": as_of_dt,
+                        "buyChange": None,
+                        "sellChange": None,
                     })
-
-                    if code:
-                        items.append({
-                            "source": "Doji",
-                            "code": code,
-                            "buyPrice": buy_price,
-                            "sellPrice": sell_price,
-                            "dateTime": as_of_dt,
-                            "buyChange": None,
-                            "sellChange": None,
-                        })
             if not items:
                 return {
                     "name": "Doji",
@@ -627,13 +1099,15 @@ class GoldPriceService:
                     "raw": raw_items,
                     "items": [],
                 }
-            return {
+            result = {
                 "name": "Doji",
                 "status": "ok",
                 "error": None,
                 "raw": raw_items,
                 "items": items,
             }
+            self._doji_last_result = copy.deepcopy(result)
+            return result
         except Exception as e:
             return {
                 "name": "Doji",
@@ -665,9 +1139,6 @@ class GoldPriceService:
                 "items": [],
             }
 
-        parsed = resp.get('json')
-        text = resp.get('text') or ''
-
         def extract_payload(data_obj):
             if isinstance(data_obj, dict) and 'chitiet' in data_obj:
                 return data_obj
@@ -681,13 +1152,10 @@ class GoldPriceService:
                         return entry
             return None
 
-        payload = extract_payload(parsed)
+        # Try the "data" array alone before parsing the whole body
+        payload = extract_payload(extract_json_array(resp, 'data'))
         if payload is None:
-            try:
-                j = json.loads(text)
-                payload = extract_payload(j)
-            except Exception:
-                payload = None
+            payload = extract_payload(resp.get('json'))
 
         if not payload or not isinstance(payload.get('chitiet'), list):
             return {
@@ -790,18 +1258,8 @@ class GoldPriceService:
             return None, None
 
         try:
-            import datetime as dt_module
-            today_start = dt_module.datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-            yesterday_start = today_start - dt_module.timedelta(days=1)
-
-            last_yesterday = self.mongo_coll.find_one(
-                {
-                    "source": self._source_key(source),
-                    "code": code,
-                    "timestamp": {"$gte": yesterday_start, "$lt": today_start},
-                },
-                sort=[("timestamp", -1)],
-            )
+            key = (self._source_key(source), code)
+            last_yesterday = self._daily_baselines([key])[key].get("yesterday_last")
 
             if not last_yesterday:
                 return None, None
@@ -825,15 +1283,9 @@ class GoldPriceService:
                 - data: Full snapshot dict with all provider data
                 - has_any_change: Boolean indicating if any provider has changes
         """
-        import datetime as dt_module
-        
         snapshot = self.get_snapshot()
         # use Hanoi/GMT+7 time for headers
-        try:
-            from zoneinfo import ZoneInfo
-            now = dt_module.datetime.now(ZoneInfo('Asia/Ho_Chi_Minh'))
-        except Exception:
-            now = dt_module.datetime.utcnow() + dt_module.timedelta(hours=7)
+        now = self._vn_now()
         
         vn_days = {
             0: 'THỨ HAI', 1: 'THỨ BA', 2: 'THỨ TƯ',
@@ -921,15 +1373,11 @@ class GoldPriceService:
                 - total_changes: Number of changed items
                 - has_any_change: Boolean indicating if any changes detected
         """
-        import datetime as dt_module
-        
-        snapshot = self.get_snapshot()
+        # Never reuse a snapshot here: its changes were already reported,
+        # and a rebuild compares them against what has been stored since.
+        snapshot = self.get_snapshot(max_age=0)
         # use GMT+7 / Hanoi time
-        try:
-            from zoneinfo import ZoneInfo
-            now = dt_module.datetime.now(ZoneInfo('Asia/Ho_Chi_Minh'))
-        except Exception:
-            now = dt_module.datetime.utcnow() + dt_module.timedelta(hours=7)
+        now = self._vn_now()
         
         vn_days = {
             0: 'THỨ HAI', 1: 'THỨ BA', 2: 'THỨ TƯ',
@@ -1005,9 +1453,73 @@ class GoldPriceService:
             'has_any_change': has_any_change
         }
 
+    def _daily_counts(self, start, end=None) -> Dict[str, Dict[Tuple[str, str], int]]:
+        """Count stored docs per Asia/Ho_Chi_Minh day and (source, code) since *start*.
+
+        Runs as one `$match`/`$group` aggregation, so only the counts leave
+        the server. Returns ``{"YYYY-MM-DD": {(source, code): count}}``.
+        """
+        match: Dict[str, Any] = {"$gte": start}
+        if end is not None:
+            match["$lt"] = end
+        rows = self.mongo_coll.aggregate([
+            {"$match": {"timestamp": match}},
+            {"$group": {
+                "_id": {
+                    "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp", "timezone": "Asia/Ho_Chi_Minh"}},
+                    "source": "$source",
+                    "code": "$code",
+                },
+                "count": {"$sum": 1},
+            }},
+        ])
+        counts: Dict[str, Dict[Tuple[str, str], int]] = {}
+        for row in rows:
+            key = row["_id"]
+            counts.setdefault(key.get("day"), {})[(key.get("source") or "N/A", key.get("code") or "N/A")] = row.get("count", 0)
+        return counts
+
+    def refresh_daily_stats(self, days: int = 7) -> Dict[str, Dict[str, Any]]:
+        """Update the per-day summary collection and return the last *days* summaries.
+
+        A summary is marked ``complete`` only once its day has ended; days
+        that are missing or were stored while still in progress (including
+        today) are recomputed, finished days are read back as stored.
+        Returns ``{}`` when no summary collection is configured.
+        """
+        if self.mongo_coll is None or self.stats_coll is None:
+            return {}
+        import datetime as dt_module
+        today_start, _ = self._day_bounds()
+        day_starts = [today_start - dt_module.timedelta(days=n) for n in range(days - 1, -1, -1)]
+        day_keys = [d.strftime("%Y-%m-%d") for d in day_starts]
+        stored = {doc["_id"]: doc for doc in self.stats_coll.find({"_id": {"$in": day_keys}})}
+        first_missing = next(
+            (n for n, key in enumerate(day_keys) if not stored.get(key, {}).get("complete")), len(day_keys) - 1
+        )
+        counts = self._daily_counts(day_starts[first_missing])
+        for key in day_keys[first_missing:]:
+            by_pair = counts.get(key, {})
+            doc = {
+                "_id": key,
+                "total": sum(by_pair.values()),
+                "by_source_code": [
+                    {"source": src, "code": code, "count": qty} for (src, code), qty in sorted(by_pair.items())
+                ],
+                "updated_at": dt_module.datetime.utcnow(),
+                # every day before today has ended, so its count is final
+                "complete": key != day_keys[-1],
+            }
+            self.stats_coll.replace_one({"_id": key}, doc, upsert=True)
+            stored[key] = doc
+        return {key: stored[key] for key in day_keys if key in stored}
+
     def check_database(self) -> Dict[str, Any]:
         """Check database status and return statistics.
-        
+
+        Uses collection metadata for the total and a server-side aggregation
+        for today's counts, so the cost does not grow with the history size.
+
         Returns:
             Dict with database statistics and formatted message
         """
@@ -1020,41 +1532,49 @@ class GoldPriceService:
             }
         
         try:
-            import datetime as dt_module
-            from collections import Counter
-            
-            count = self.mongo_coll.count_documents({})
+            count = self.mongo_coll.estimated_document_count()
             lines = [
                 "=" * 80,
                 "KIỂM TRA CƠ SỞ DỮ LIỆU",
                 "=" * 80,
-                f"Tổng số bản ghi: {count}"
+                f"Tổng số bản ghi (ước tính): {count}"
             ]
             
             stats = {
                 'total_count': count,
                 'today_count': 0,
                 'by_source_code': {},
-                'latest_records': []
+                'latest_records': [],
+                'daily': {}
             }
             
             if count > 0:
-                today = dt_module.datetime.now().date()
-                recent_for_stats = list(self.mongo_coll.find().sort('timestamp', -1).limit(500))
-                today_docs = [
-                    doc for doc in recent_for_stats
-                    if hasattr(doc.get('timestamp'), 'date') and doc.get('timestamp').date() == today
-                ]
-                today_counter = Counter((doc.get('source', 'N/A'), doc.get('code', 'N/A')) for doc in today_docs)
+                today_start, _ = self._day_bounds()
+                today_key = today_start.strftime("%Y-%m-%d")
+                if self.stats_coll is not None:
+                    daily = self.refresh_daily_stats()
+                    stats['daily'] = {key: doc.get('total', 0) for key, doc in daily.items()}
+                    today_doc = daily.get(today_key) or {}
+                    today_counter = {
+                        (row.get('source'), row.get('code')): row.get('count', 0)
+                        for row in today_doc.get('by_source_code', [])
+                    }
+                else:
+                    today_counter = self._daily_counts(today_start).get(today_key, {})
+                today_count = sum(today_counter.values())
                 
-                stats['today_count'] = len(today_docs)
+                stats['today_count'] = today_count
                 stats['by_source_code'] = dict(today_counter)
                 
-                lines.append(f"Bản ghi hôm nay: {len(today_docs)}")
+                lines.append(f"Bản ghi hôm nay: {today_count}")
                 if today_counter:
                     lines.append("Theo nguồn/mã (hôm nay):")
                     for (src, code), qty in sorted(today_counter.items()):
                         lines.append(f"  - {src:10s} | {code:5s} | {qty} bản ghi")
+                if stats['daily']:
+                    lines.append("Theo ngày:")
+                    for day, total in stats['daily'].items():
+                        lines.append(f"  - {day} | {total} bản ghi")
                 
                 # Show latest records
                 latest = list(self.mongo_coll.find().sort('timestamp', -1).limit(10))
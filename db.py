@@ -0,0 +1,159 @@
+"""
+Process-wide MongoDB client pool.
+
+`MongoClient` keeps its own connection pool and is thread-safe, so every
+component (GoldPriceService, GoldWatcher, Agent, CLI) should share one
+client per URI instead of opening its own sockets and TLS sessions.
+
+It also bootstraps the gold price history collection: a time-series
+collection (timeField ``timestamp``, metaField ``meta`` = {source, code})
+when the server supports it, a plain collection otherwise, plus the indexes
+the price queries rely on.
+
+Usage:
+    from db import get_mongo_client, ensure_price_collection
+
+    client = get_mongo_client()          # uses MONGO_URI from config
+    coll = client[MONGO_DB_NAME][MONGO_COLLECTION]
+    time_series = ensure_price_collection(client[MONGO_DB_NAME], MONGO_COLLECTION)
+"""
+
+import datetime as dt_module
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import MONGO_URI
+
+try:
+    from pymongo import MongoClient, ASCENDING, DESCENDING
+except Exception:
+    MongoClient = None
+    ASCENDING, DESCENDING = 1, -1
+
+
+_clients: Dict[str, "MongoClient"] = {}
+_lock = threading.Lock()
+
+PRICE_META_FIELD = "meta"
+PRICE_TIME_SERIES_OPTIONS = {"timeField": "timestamp", "metaField": PRICE_META_FIELD, "granularity": "minutes"}
+
+
+def get_mongo_client(mongo_uri: Optional[str] = None) -> Optional["MongoClient"]:
+    """Return the shared MongoClient for *mongo_uri* (default: MONGO_URI).
+
+    Returns None when pymongo is missing, no URI is configured or the
+    client could not be created.
+    """
+    uri = mongo_uri if mongo_uri is not None else MONGO_URI
+    if MongoClient is None or not uri:
+        return None
+    with _lock:
+        client = _clients.get(uri)
+        if client is None:
+            try:
+                client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+            except Exception:
+                logging.exception('db: MongoDB connection failed')
+                return None
+            _clients[uri] = client
+        return client
+
+
+def close_mongo_clients() -> None:
+    """Close every pooled client (e.g. on shutdown)."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception:
+            logging.exception('db: failed closing MongoClient')
+
+
+def price_pair_fields(time_series: bool) -> Tuple[str, str]:
+    """Field names to filter and sort price docs by (source, code)."""
+    if time_series:
+        return PRICE_META_FIELD + ".source", PRICE_META_FIELD + ".code"
+    return "source", "code"
+
+
+def _price_indexes(time_series: bool) -> List[List[Tuple[str, int]]]:
+    source_field, code_field = price_pair_fields(time_series)
+    return [
+        [(source_field, ASCENDING), (code_field, ASCENDING), ("timestamp", DESCENDING)],
+        [("timestamp", DESCENDING)],
+    ]
+
+
+def is_time_series(db, name: str) -> bool:
+    """Return True if collection *name* exists and is a time-series collection."""
+    for info in db.list_collections(filter={"name": name}):
+        return bool((info.get("options") or {}).get("timeseries"))
+    return False
+
+
+def ensure_price_collection(db, name: str, time_series: bool = True) -> bool:
+    """Create collection *name* if needed and make sure its indexes exist.
+
+    A missing collection is created as a time-series collection when
+    *time_series* is set and the server supports it (MongoDB 5.0+). An
+    existing plain collection is left as is; see `migrate_price_collection`.
+    Returns True when the collection is time-series.
+    """
+    if time_series and name not in db.list_collection_names():
+        try:
+            db.create_collection(name, timeseries=PRICE_TIME_SERIES_OPTIONS)
+            logging.info('db: created time-series collection %s', name)
+        except Exception as exc:
+            logging.warning('db: could not create time-series collection %s (%s); using a plain collection', name, exc)
+    ts = is_time_series(db, name)
+    coll = db[name]
+    existing = [list(info.get("key", {}).items()) for info in coll.list_indexes()]
+    for keys in _price_indexes(ts):
+        if keys in existing:
+            continue
+        try:
+            coll.create_index(keys)
+        except Exception:
+            logging.exception('db: could not create index %s on %s', keys, name)
+    return ts
+
+
+def migrate_price_collection(db, name: str, batch_size: int = 1000) -> Dict[str, Any]:
+    """Move a plain price collection *name* into a new time-series collection.
+
+    The old collection is renamed to ``<name>_legacy_<YYYYmmddHHMMSS>`` and
+    kept for the operator to drop once the copy is checked. Documents are
+    copied in batches of *batch_size* with ``meta`` = {source, code} added.
+    Returns ``{'migrated', 'copied', 'legacy'}``.
+    """
+    if name not in db.list_collection_names() or is_time_series(db, name):
+        ensure_price_collection(db, name)
+        return {'migrated': False, 'copied': 0, 'legacy': None}
+
+    legacy = f"{name}_legacy_{dt_module.datetime.utcnow():%Y%m%d%H%M%S}"
+    db[name].rename(legacy)
+    if not ensure_price_collection(db, name):
+        db[name].drop()
+        db[legacy].rename(name)
+        raise RuntimeError('db: server does not support time-series collections; migration undone')
+
+    target = db[name]
+    copied = 0
+    batch: List[Dict[str, Any]] = []
+    for doc in db[legacy].find({}, {"_id": 0}).sort("timestamp", ASCENDING):
+        if doc.get("timestamp") is None:
+            continue
+        doc[PRICE_META_FIELD] = {"source": doc.get("source"), "code": doc.get("code")}
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            target.insert_many(batch, ordered=False)
+            copied += len(batch)
+            batch = []
+    if batch:
+        target.insert_many(batch, ordered=False)
+        copied += len(batch)
+    logging.info('db: migrated %d documents from %s into time-series %s', copied, legacy, name)
+    return {'migrated': True, 'copied': copied, 'legacy': legacy}
@@ -0,0 +1,67 @@
+"""
+Single-pass parser for the Doji price table (`vungmien_*.dat`).
+
+All patterns are compiled once. Rows are scanned lazily with `finditer`;
+only a row's first (label) cell is cleaned of tags and entities before it
+is compared, the price cells are read only for matching rows, and scanning
+stops as soon as every target label was found. Only the first row
+matching each target is returned; later rows with the same label are
+ignored.
+
+Usage:
+    from doji_parser import find_price_rows
+
+    for label, numbers in find_price_rows(html, ["SJC - Bán Lẻ"]):
+        ...
+"""
+
+import html
+import re
+from typing import Iterable, List, Tuple
+
+
+_ROW_RE = re.compile(r'<tr[^>]*>(.*?)</tr>', re.S | re.I)
+_CELL_RE = re.compile(r'<td[^>]*>(.*?)</td>', re.S | re.I)
+_TAG_RE = re.compile(r'<.*?>')
+_NUMBER_RE = re.compile(r'([0-9][0-9\.,]+)')
+
+
+def _text(fragment: str) -> str:
+    text = _TAG_RE.sub('', fragment)
+    return html.unescape(text) if '&' in text else text
+
+
+def find_price_rows(raw: str, targets: Iterable[str]) -> List[Tuple[str, List[str]]]:
+    """Return (label, numbers) for the first row matching each target label.
+
+    A row matches a target when its first cell equals or contains it (after
+    stripping tags and decoding HTML entities). *numbers* holds the first
+    number-looking token of every following cell, e.g. ``["14,850",
+    "15,050"]`` for buy/sell.
+    """
+    remaining = list(targets)
+    found: List[Tuple[str, List[str]]] = []
+    for row_match in _ROW_RE.finditer(raw):
+        row = row_match.group(1)
+        # Only the label cell is cleaned before deciding: most rows are
+        # other products, and their price cells are never looked at.
+        first = _CELL_RE.search(row)
+        if not first:
+            continue
+        label = _text(first.group(1)).strip()
+        matched = [target for target in remaining if label == target or target in label]
+        if not matched:
+            continue
+
+        numbers = []
+        for td in _CELL_RE.findall(row, first.end()):
+            cell = _text(td)
+            m = _NUMBER_RE.search(cell)
+            if m:
+                numbers.append(m.group(1))
+        found.append((label, numbers))
+
+        remaining = [target for target in remaining if target not in matched]
+        if not remaining:
+            break
+    return found
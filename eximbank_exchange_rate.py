@@ -11,14 +11,44 @@ Usage:
 
     service = EximbankExchangeRateService(APIClient(verify=False))
     result = service.get_rate('USD')
+
+    # from a coroutine, with an AsyncAPIClient:
+    service = EximbankExchangeRateService(APIClient(verify=False), AsyncAPIClient(verify=False))
+    result = await service.aget_rate('USD')
+
+The parsed table is cached for `cache_ttl` seconds (EXIMBANK_RATE_TTL) and
+indexed by CCYCD, so bursts of lookups cost one request per refresh window
+and O(1) per code. The index is only rebuilt when the table's QUOTETM
+changes; if a refresh fails, the previous table keeps being served.
+
+When MongoDB is configured, every new table is written to
+EXIMBANK_RATE_COLLECTION with insert-only-on-change semantics (one batched
+insert per refresh) and can be read back with `get_history`:
+
+    history = service.get_history('USD', start=datetime(2024, 1, 1))
 """
 
+import asyncio
+import datetime as dt_module
 import logging
-from typing import Any, Dict, List, Optional, Union
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from config import MONGO_URI, MONGO_DB_NAME, EXIMBANK_RATE_COLLECTION, EXIMBANK_RATE_TTL
+from db import get_mongo_client
+
+try:
+    from pymongo import ASCENDING, DESCENDING
+except Exception:
+    ASCENDING, DESCENDING = 1, -1
 
 
 _BASE_URL = "https://eximbank.com.vn/api/front/v1/exchange-rate"
 
+# Rate fields persisted to history; a change in any of them stores a new doc
+_HISTORY_FIELDS = ("buy_cash", "sell_cash", "buy_transfer", "sell_transfer")
+
 _HEADERS = {
     "Accept": "*/*",
     "Accept-Encoding": "gzip, deflate, br, zstd",
@@ -41,9 +71,30 @@ _HEADERS = {
 
 
 class EximbankExchangeRateService:
-    def __init__(self, api_client, branch_code: str = "1000"):
+    def __init__(self, api_client, async_api_client=None, branch_code: str = "1000",
+                 cache_ttl: float = EXIMBANK_RATE_TTL, mongo_uri: Optional[str] = None,
+                 db_name: str = MONGO_DB_NAME, collection: str = EXIMBANK_RATE_COLLECTION):
         self.api_client = api_client
+        self.async_api_client = async_api_client
         self.branch_code = branch_code
+        self.cache_ttl = cache_ttl
+        self.mongo_coll = None
+        mongo_client = get_mongo_client(mongo_uri if mongo_uri is not None else MONGO_URI)
+        if mongo_client is not None:
+            try:
+                self.mongo_coll = mongo_client[db_name][collection]
+                self.mongo_coll.create_index([("code", ASCENDING), ("timestamp", DESCENDING)])
+            except Exception:
+                logging.exception("EximbankExchangeRateService: MongoDB setup failed")
+                self.mongo_coll = None
+        # Last stored rates per code; None until loaded from the collection
+        self._last_rates: Optional[Dict[str, Dict[str, Any]]] = None
+        # {ccycd: rate dict}, the QUOTETM it was built from and when it was fetched
+        self._index: Optional[Dict[str, Dict[str, Any]]] = None
+        self._quote_time: Optional[str] = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._async_lock: Optional[asyncio.Lock] = None
 
     def get_rate(
         self, code: Union[str, List[str], None] = None
@@ -58,6 +109,191 @@ class EximbankExchangeRateService:
         Each successful dict has keys: name, code, buy_cash, sell_cash,
         buy_transfer, sell_transfer.
         """
+        index = self._fresh_index()
+        if index is None:
+            # One thread refreshes; concurrent callers wait and reuse its table
+            with self._lock:
+                index = self._fresh_index()
+                if index is None:
+                    try:
+                        resp = self.api_client.get(_BASE_URL, **self._request_kwargs())
+                    except Exception as exc:
+                        logging.error("EximbankExchangeRateService: request failed: %s", exc)
+                        index = self._refresh_failed(f"Lỗi khi gọi API tỷ giá Eximbank: {exc}")
+                    else:
+                        index, rebuilt = self._refresh(resp)
+                        if rebuilt:
+                            self.record_rates(index)
+        return self._build_result(index, code)
+
+    async def aget_rate(
+        self, code: Union[str, List[str], None] = None
+    ) -> Union[Dict[str, Any], List[Any], str]:
+        """Async variant of `get_rate` that does not block the event loop.
+
+        Uses `async_api_client` when configured, otherwise runs `get_rate`
+        on a worker thread.
+        """
+        if self.async_api_client is None:
+            return await asyncio.to_thread(self.get_rate, code)
+        index = self._fresh_index()
+        if index is None:
+            if self._async_lock is None:
+                self._async_lock = asyncio.Lock()
+            async with self._async_lock:
+                index = self._fresh_index()
+                if index is None:
+                    try:
+                        resp = await self.async_api_client.get(_BASE_URL, **self._request_kwargs())
+                    except Exception as exc:
+                        logging.error("EximbankExchangeRateService: request failed: %s", exc)
+                        index = self._refresh_failed(f"Lỗi khi gọi API tỷ giá Eximbank: {exc}")
+                    else:
+                        index, rebuilt = self._refresh(resp)
+                        if rebuilt:
+                            await asyncio.to_thread(self.record_rates, index)
+        return self._build_result(index, code)
+
+    def invalidate(self) -> None:
+        """Force the next lookup to fetch the table again."""
+        self._fetched_at = 0.0
+
+    def _fresh_index(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        if self._index is not None and time.monotonic() - self._fetched_at < self.cache_ttl:
+            return self._index
+        return None
+
+    def _refresh(self, resp: Dict[str, Any]) -> Tuple[Union[Dict[str, Dict[str, Any]], str], bool]:
+        """Update the cached index from *resp*.
+
+        Returns (index or error string, whether a new table was indexed).
+        """
+        if not resp.get("ok"):
+            error = f"Lỗi khi lấy dữ liệu tỷ giá Eximbank: {resp.get('error')}"
+        elif resp.get("json") is None:
+            error = "Không nhận được dữ liệu hợp lệ từ API Eximbank."
+        else:
+            table = self._parse_table(resp.get("json"))
+            if isinstance(table, str):
+                error = table
+            else:
+                items, quote_time = table
+                rebuilt = self._index is None or quote_time != self._quote_time
+                if rebuilt:
+                    self._index = self._index_items(items)
+                    self._quote_time = quote_time
+                self._fetched_at = time.monotonic()
+                return self._index, rebuilt
+        return self._refresh_failed(error), False
+
+    def _refresh_failed(self, error: str) -> Union[Dict[str, Dict[str, Any]], str]:
+        if self._index is not None:
+            logging.warning("EximbankExchangeRateService: refresh failed, serving cached table (%s)", error)
+            return self._index
+        return error
+
+    def record_rates(self, index: Dict[str, Dict[str, Any]]) -> int:
+        """Store the rates in *index* that differ from the last stored ones.
+
+        All changed currencies go to MongoDB in one unordered insert_many.
+        Returns the number of documents inserted.
+        """
+        if self.mongo_coll is None:
+            return 0
+        last_rates = self._load_last_rates()
+        if last_rates is None:
+            return 0
+        timestamp = dt_module.datetime.utcnow()
+        docs = []
+        for code, rate in index.items():
+            doc = {field: self._to_number(rate.get(field)) for field in _HISTORY_FIELDS}
+            if all(value is None for value in doc.values()):
+                continue
+            last = last_rates.get(code.upper())
+            if last is not None and all(last.get(field) == doc[field] for field in _HISTORY_FIELDS):
+                continue
+            doc.update({"timestamp": timestamp, "code": code.upper(), "quote_time": rate.get("quote_time")})
+            docs.append(doc)
+        if not docs:
+            logging.info("No exchange rate change, skipping insert")
+            return 0
+        try:
+            self.mongo_coll.insert_many(docs, ordered=False)
+        except Exception:
+            logging.exception("EximbankExchangeRateService: failed to store rate history")
+            # Reload on the next refresh so only what actually landed counts
+            self._last_rates = None
+            return 0
+        for doc in docs:
+            last_rates[doc["code"]] = {field: doc[field] for field in _HISTORY_FIELDS}
+        logging.info("Stored %d exchange rate changes", len(docs))
+        return len(docs)
+
+    def get_history(
+        self,
+        code: str,
+        start: Optional[dt_module.datetime] = None,
+        end: Optional[dt_module.datetime] = None,
+        limit: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """Return stored rate changes for *code* between *start* and *end*, oldest first.
+
+        Timestamps are naive UTC. *limit* keeps only the most recent N docs.
+        """
+        if self.mongo_coll is None:
+            return []
+        query: Dict[str, Any] = {"code": (code or "").strip().upper()}
+        if start is not None or end is not None:
+            query["timestamp"] = {}
+            if start is not None:
+                query["timestamp"]["$gte"] = start
+            if end is not None:
+                query["timestamp"]["$lt"] = end
+        try:
+            cursor = self.mongo_coll.find(query, {"_id": 0}).sort("timestamp", DESCENDING)
+            if limit:
+                cursor = cursor.limit(limit)
+            docs = list(cursor)
+        except Exception:
+            logging.exception("EximbankExchangeRateService: failed to read rate history")
+            return []
+        docs.reverse()
+        return docs
+
+    def _load_last_rates(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        if self._last_rates is not None:
+            return self._last_rates
+        try:
+            rows = self.mongo_coll.aggregate([
+                {"$sort": {"code": 1, "timestamp": -1}},
+                {"$group": {"_id": "$code", "doc": {"$first": {field: "$" + field for field in _HISTORY_FIELDS}}}},
+            ])
+            last_rates = {row["_id"]: row.get("doc") or {} for row in rows}
+        except Exception:
+            logging.exception("EximbankExchangeRateService: failed to load last stored rates")
+            return None
+        self._last_rates = last_rates
+        return last_rates
+
+    @staticmethod
+    def _to_number(value: Any) -> Optional[float]:
+        text = str(value or "").replace(",", "").strip()
+        try:
+            return float(text) if text else None
+        except ValueError:
+            return None
+
+    def _request_kwargs(self) -> Dict[str, Any]:
+        return {
+            "params": {"strBRCD": "1000"},
+            "headers": _HEADERS,
+            "timeout": 10,
+            "verify": False,
+        }
+
+    def _build_result(
+        self, index: Union[Dict[str, Dict[str, Any]], str], code: Union[str, List[str], None]
+    ) -> Union[Dict[str, Any], List[Any], str]:
         if code is None:
             codes: List[str] = ["usd", "jpy"]
         elif isinstance(code, list):
@@ -65,49 +301,38 @@ class EximbankExchangeRateService:
         else:
             codes = [code.strip().lower()]
         single = len(codes) == 1
-        params = {
-            "strBRCD": "1000",
-        }
-        try:
-            resp = self.api_client.get(
-                _BASE_URL,
-                params=params,
-                headers=_HEADERS,
-                timeout=10,
-                verify=False,
-            )
-        except Exception as exc:
-            logging.error("EximbankExchangeRateService: request failed: %s", exc)
-            return f"Lỗi khi gọi API tỷ giá Eximbank: {exc}"
 
-        if not resp.get("ok"):
-            return f"Lỗi khi lấy dữ liệu tỷ giá Eximbank: {resp.get('error')}"
+        if isinstance(index, str):
+            return index
 
-        parsed = resp.get("json")
-        if parsed is None:
-            return "Không nhận được dữ liệu hợp lệ từ API Eximbank."
-
-        results = [self._find_currency(parsed, c) for c in codes]
+        results = [self._find_currency(index, c) for c in codes]
         return results[0] if single else results
 
-    def _find_currency(self, data: Any, code: str) -> Dict[str, Any] | str:
-        code_norm = (code or "usd").strip().lower()
-
+    @staticmethod
+    def _parse_table(data: Any) -> Union[Tuple[List[Any], str], str]:
         # Top-level list or wrapped in "data" key
         items = data if isinstance(data, list) else (
             data.get("data") if isinstance(data, dict) else None
         )
         if not isinstance(items, list):
             return "Cấu trúc phản hồi từ Eximbank không như mong đợi."
+        quote_time = max(
+            (str(itm.get("QUOTETM") or "") for itm in items if isinstance(itm, dict)),
+            default="",
+        )
+        return items, quote_time
 
+    @staticmethod
+    def _index_items(items: List[Any]) -> Dict[str, Dict[str, Any]]:
+        index: Dict[str, Dict[str, Any]] = {}
         for itm in items:
             if not isinstance(itm, dict):
                 continue
             itm_code = str(itm.get("CCYCD") or "").strip().lower()
-            if itm_code != code_norm:
+            if not itm_code or itm_code in index:
                 continue
 
-            return {
+            index[itm_code] = {
                 "name": str(itm.get("Cur_NameVN") or itm.get("Cur_NameEN") or itm_code.upper()),
                 "code": itm_code.upper(),
                 "buy_cash": str(itm.get("CSHBUYRT") or ""),
@@ -120,5 +345,12 @@ class EximbankExchangeRateService:
                 "sell_transfer_diff": str(itm.get("TTSELLRT_DIFF") or ""),
                 "quote_time": str(itm.get("QUOTETM") or ""),
             }
+        return index
 
-        return f"Không tìm thấy thông tin cho mã tiền tệ '{code.upper()}'."
+    def _find_currency(self, index: Dict[str, Dict[str, Any]], code: str) -> Dict[str, Any] | str:
+        code_norm = (code or "usd").strip().lower()
+        rate = index.get(code_norm)
+        if rate is None:
+            return f"Không tìm thấy thông tin cho mã tiền tệ '{code.upper()}'."
+        # Callers get their own copy; the cached table stays untouched
+        return dict(rate)
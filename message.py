@@ -1,9 +1,12 @@
+import asyncio
 import logging
 import json
 from telegram.ext import ContextTypes
 from agent import Agent
 import os
 from telegram import MessageEntity
+from telegram.error import BadRequest, RetryAfter
+from typing import Any, Dict
 
 agent = None
 
@@ -50,10 +53,15 @@ async def handle_message(update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     logging.info(f"User({chat_id}) sent: {text}")
-    ai_response = agent.ask(text)
+    # The reply is generated on a worker thread and shown as it streams in;
+    # chat_id lets follow-up questions see the chat's recent history
+    try:
+        ai_response = await stream_reply(context.bot, chat_id, agent.astream(text, chat_id=chat_id))
+    except Exception as e:
+        logging.exception('AI reply failed for chat %s', chat_id)
+        await context.bot.send_message(chat_id=chat_id, text=f"Lỗi khi trả lời: {e}", **_send_kwargs(chat_id))
+        return
     logging.info(f"Bot reply to User({chat_id}): {ai_response}")
-    for i in range(0, len(ai_response), 4096):
-        await context.bot.send_message(chat_id=chat_id, text=ai_response[i:i+4096], **_send_kwargs(chat_id))
 
 
 async def handle_gold(update, context: ContextTypes.DEFAULT_TYPE):
@@ -79,7 +87,7 @@ async def handle_money(update, context: ContextTypes.DEFAULT_TYPE):
         code = args[0]
 
     try:
-        result = agent.get_money_rate(code)
+        result = await agent.aget_money_rate(code)
     except Exception as e:
         result = f"Lỗi lấy thông tin tiền tệ: {e}"
 
@@ -111,17 +119,13 @@ async def handle_help(update, context: ContextTypes.DEFAULT_TYPE):
     await context.bot.send_message(chat_id=chat_id, text=text, **_send_kwargs(chat_id))
 
 
-async def send_money_to(chat_id, context: ContextTypes.DEFAULT_TYPE):
-    """Send default USD+JPY exchange rates to a given chat id (scheduled job)."""
-    logging.info(f"Sending money rate to chat {chat_id}")
-    if not agent:
-        return
+async def render_money_message() -> str:
+    """Fetch default USD+JPY exchange rates and render them as message text."""
     try:
-        result = agent.get_money_rate()
+        result = await agent.aget_money_rate()
     except Exception as e:
-        logging.exception('Failed fetching money rate in send_money_to')
-        await context.bot.send_message(chat_id=chat_id, text=f"Lỗi lấy tỷ giá: {e}", **_send_kwargs(chat_id))
-        return
+        logging.exception('Failed fetching money rate in render_money_message')
+        return f"Lỗi lấy tỷ giá: {e}"
 
     def _format_rate(r) -> str:
         if not isinstance(r, dict):
@@ -136,36 +140,190 @@ async def send_money_to(chat_id, context: ContextTypes.DEFAULT_TYPE):
         return '\n'.join(lines)
 
     if isinstance(result, list):
-        text = '\n\n'.join(_format_rate(r) for r in result)
-    else:
-        text = _format_rate(result)
-
-    for i in range(0, len(text), 4096):
-        await context.bot.send_message(chat_id=chat_id, text=text[i:i+4096], **_send_kwargs(chat_id))
+        return '\n\n'.join(_format_rate(r) for r in result)
+    return _format_rate(result)
 
 
-async def send_gold_to(chat_id, context: ContextTypes.DEFAULT_TYPE):
-    """Send gold price to a given chat id (used by command and scheduled jobs).
+async def render_gold_message() -> str:
+    """Render the gold price message shared by /gold and the scheduled jobs.
 
     Uses `GoldPriceService.get_info()` so formatting matches CLI and watcher
     output. The service also handles database comparisons and message
     composition, keeping behavior consistent across components.
     """
+    try:
+        # Reuse the agent's service so bursts of /gold share one cached snapshot;
+        # the crawl runs on a worker thread to keep the event loop free
+        result = await asyncio.to_thread(agent.gold_service.get_info)
+        return result.get('message') or json.dumps(result.get('data', {}), ensure_ascii=False, indent=2)
+    except Exception as e:
+        logging.exception('Failed fetching gold info in render_gold_message')
+        return f"Lỗi lấy thông tin giá vàng: {e}"
+
+
+async def send_money_to(chat_id, context: ContextTypes.DEFAULT_TYPE):
+    """Send default USD+JPY exchange rates to a given chat id (scheduled job)."""
+    logging.info(f"Sending money rate to chat {chat_id}")
+    if not agent:
+        return
+    text = await render_money_message()
+    for i in range(0, len(text), 4096):
+        await context.bot.send_message(chat_id=chat_id, text=text[i:i+4096], **_send_kwargs(chat_id))
+
+
+async def send_gold_to(chat_id, context: ContextTypes.DEFAULT_TYPE):
+    """Send gold price to a given chat id (used by the /gold command)."""
     logging.info(f"Sending gold price to chat {chat_id}")
     if not agent:
         await context.bot.send_message(chat_id=chat_id, text="Agent not configured.", **_send_kwargs(chat_id))
         return
 
+    text = await render_gold_message()
+    for i in range(0, len(text), 4096):
+        await context.bot.send_message(chat_id=chat_id, text=text[i:i+4096], **_send_kwargs(chat_id))
+
+
+# ---------------------------------------------------------------------------
+# Broadcast
+# ---------------------------------------------------------------------------
+# Telegram allows ~30 messages/s per bot, 1 message/s per private chat and
+# 20 messages/min per group; stay a little under those limits.
+GLOBAL_MESSAGES_PER_SEC = 25
+PRIVATE_CHAT_INTERVAL = 1.0
+GROUP_CHAT_INTERVAL = 3.0
+BROADCAST_CONCURRENCY = 20
+BROADCAST_MAX_RETRIES = 3
+
+_global_next_send = 0.0
+_global_send_lock = None
+_chat_next_send: Dict[int, float] = {}
+
+
+async def _wait_send_slot(chat_id) -> None:
+    """Sleep until both the global and the per-chat rate limit allow a message."""
+    global _global_next_send, _global_send_lock
+    if _global_send_lock is None:
+        _global_send_lock = asyncio.Lock()
+    loop = asyncio.get_running_loop()
+    interval = GROUP_CHAT_INTERVAL if chat_id < 0 else PRIVATE_CHAT_INTERVAL
+
+    now = loop.time()
+    chat_at = max(now, _chat_next_send.get(chat_id, 0.0))
+    _chat_next_send[chat_id] = chat_at + interval
+    if chat_at > now:
+        await asyncio.sleep(chat_at - now)
+
+    async with _global_send_lock:
+        now = loop.time()
+        global_at = max(now, _global_next_send)
+        _global_next_send = global_at + 1.0 / GLOBAL_MESSAGES_PER_SEC
+    if global_at > now:
+        await asyncio.sleep(global_at - now)
+
+
+async def _deliver(bot, chat_id, text: str) -> Dict[str, Any]:
+    attempts = 0
     try:
-        from api_client import APIClient
-        from crawl_gold_price import GoldPriceService
-        api_client = APIClient()
-        service = GoldPriceService(api_client)
-        result = service.get_info()
-        text = result.get('message') or json.dumps(result.get('data', {}), ensure_ascii=False, indent=2)
+        for i in range(0, len(text), 4096):
+            chunk = text[i:i+4096]
+            # retries are counted per chunk: earlier chunks' sends don't use them up
+            retries = 0
+            while True:
+                attempts += 1
+                await _wait_send_slot(chat_id)
+                try:
+                    await bot.send_message(chat_id=chat_id, text=chunk, **_send_kwargs(chat_id))
+                    break
+                except RetryAfter as e:
+                    retries += 1
+                    if retries > BROADCAST_MAX_RETRIES:
+                        raise
+                    delay = e.retry_after
+                    delay = delay.total_seconds() if hasattr(delay, 'total_seconds') else float(delay)
+                    logging.warning('Flood control for chat %s; retrying in %.1fs', chat_id, delay)
+                    _chat_next_send[chat_id] = asyncio.get_running_loop().time() + delay
+        return {'ok': True, 'error': None, 'attempts': attempts}
     except Exception as e:
-        logging.exception('Failed fetching gold info in send_gold_to')
-        text = f"Lỗi lấy thông tin giá vàng: {e}"
+        logging.exception('Failed sending broadcast message to %s', chat_id)
+        return {'ok': False, 'error': str(e), 'attempts': attempts}
 
-    for i in range(0, len(text), 4096):
-        await context.bot.send_message(chat_id=chat_id, text=text[i:i+4096], **_send_kwargs(chat_id))
+
+async def broadcast(bot, chat_ids, text: str) -> Dict[int, Dict[str, Any]]:
+    """Send one pre-rendered *text* to every chat in *chat_ids* concurrently.
+
+    Sends respect Telegram's global and per-chat rate limits and retry on
+    RetryAfter. Returns a per-chat report: ``{chat_id: {'ok', 'error', 'attempts'}}``.
+    """
+    semaphore = asyncio.Semaphore(BROADCAST_CONCURRENCY)
+
+    async def _send(cid):
+        async with semaphore:
+            return cid, await _deliver(bot, cid, text)
+
+    report = dict(await asyncio.gather(*(_send(cid) for cid in dict.fromkeys(chat_ids))))
+    failed = [cid for cid, r in report.items() if not r['ok']]
+    logging.info('Broadcast delivered to %d/%d chats%s', len(report) - len(failed), len(report),
+                 f"; failed: {failed}" if failed else '')
+    return report
+
+
+# ---------------------------------------------------------------------------
+# Streaming replies
+# ---------------------------------------------------------------------------
+# Minimum seconds between edits of a streamed private-chat reply; groups use
+# GROUP_CHAT_INTERVAL.
+STREAM_EDIT_INTERVAL = 1.0
+
+
+async def _show_text(bot, chat_id, message, text: str, final: bool = False):
+    """Send *text* as a new message, or edit *message* to show it.
+
+    Returns the Telegram message, or None if a non-final edit was dropped
+    because of flood control.
+    """
+    while True:
+        try:
+            if message is None:
+                return await bot.send_message(chat_id=chat_id, text=text, **_send_kwargs(chat_id))
+            await bot.edit_message_text(text=text, chat_id=chat_id, message_id=message.message_id)
+            return message
+        except BadRequest as e:
+            if 'not modified' in str(e).lower():
+                return message
+            raise
+        except RetryAfter as e:
+            if not final:
+                return None
+            delay = e.retry_after
+            await asyncio.sleep(delay.total_seconds() if hasattr(delay, 'total_seconds') else float(delay))
+
+
+async def stream_reply(bot, chat_id, chunks) -> str:
+    """Show the text pieces from async iterator *chunks* in *chat_id* as they arrive.
+
+    The first piece is sent right away. The message is then edited at most
+    once per STREAM_EDIT_INTERVAL, and a new message is started every 4096
+    characters. Returns the full text.
+    """
+    loop = asyncio.get_running_loop()
+    interval = GROUP_CHAT_INTERVAL if chat_id < 0 else STREAM_EDIT_INTERVAL
+    parts = []
+    message = None   # message being edited
+    text = ''        # text that belongs in it
+    shown = ''       # text it currently shows
+    next_edit = 0.0
+    async for chunk in chunks:
+        parts.append(chunk)
+        text += chunk
+        while len(text) > 4096:
+            head, text = text[:4096], text[4096:]
+            await _show_text(bot, chat_id, message, head, final=True)
+            message, shown = None, ''
+        if text and text != shown and loop.time() >= next_edit:
+            shown_message = await _show_text(bot, chat_id, message, text)
+            if shown_message is not None:
+                message, shown = shown_message, text
+            next_edit = loop.time() + interval
+    if text and text != shown:
+        await _show_text(bot, chat_id, message, text, final=True)
+    return ''.join(parts)
@@ -0,0 +1,66 @@
+"""
+Process-wide service registry.
+
+Hands out one shared APIClient, AsyncAPIClient, GoldPriceService and
+EximbankExchangeRateService per process so that `/gold`, the watcher jobs,
+the Agent and the CLI reuse the same pooled connections and snapshot cache.
+
+Usage:
+    from registry import get_gold_service
+
+    info = get_gold_service().get_info()
+"""
+
+import threading
+from typing import Dict, Optional, Tuple
+
+from config import MONGO_URI, MONGO_DB_NAME, MONGO_COLLECTION
+from api_client import APIClient, AsyncAPIClient
+from crawl_gold_price import GoldPriceService
+from eximbank_exchange_rate import EximbankExchangeRateService
+
+
+_lock = threading.RLock()
+_api_client: Optional[APIClient] = None
+_async_api_client: Optional[AsyncAPIClient] = None
+_gold_services: Dict[Tuple[str, str, str], GoldPriceService] = {}
+_eximbank_service: Optional[EximbankExchangeRateService] = None
+
+
+def get_api_client() -> APIClient:
+    """Return the shared APIClient (SSL verification off for legacy endpoints)."""
+    global _api_client
+    with _lock:
+        if _api_client is None:
+            _api_client = APIClient(verify=False)
+        return _api_client
+
+
+def get_async_api_client() -> AsyncAPIClient:
+    """Return the shared AsyncAPIClient for coroutines on the bot's event loop."""
+    global _async_api_client
+    with _lock:
+        if _async_api_client is None:
+            _async_api_client = AsyncAPIClient(verify=False, sync_client=get_api_client())
+        return _async_api_client
+
+
+def get_gold_service(mongo_uri: Optional[str] = None, db_name: str = MONGO_DB_NAME,
+                     collection: str = MONGO_COLLECTION) -> GoldPriceService:
+    """Return the shared GoldPriceService for the given MongoDB target."""
+    key = (mongo_uri if mongo_uri is not None else MONGO_URI, db_name, collection)
+    with _lock:
+        service = _gold_services.get(key)
+        if service is None:
+            service = GoldPriceService(get_api_client(), mongo_uri=key[0], db_name=db_name, collection=collection)
+            _gold_services[key] = service
+        return service
+
+
+def get_eximbank_service() -> EximbankExchangeRateService:
+    """Return the shared EximbankExchangeRateService."""
+    global _eximbank_service
+    with _lock:
+        if _eximbank_service is None:
+            _eximbank_service = EximbankExchangeRateService(get_api_client(), get_async_api_client())
+        return _eximbank_service
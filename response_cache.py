@@ -0,0 +1,125 @@
+"""
+Exact-match LRU/TTL cache for AI replies.
+
+Keys are (provider, model, system_prompt, normalized prompt); prompts are
+normalized by Unicode form, case, whitespace and trailing punctuation, so
+"Giá vàng hôm nay?" and "giá vàng  hôm nay" share one entry. There is no
+semantic matching. Entries expire after `ttl` seconds and the least recently
+used entry is dropped beyond `maxsize`. With a `path`, the cache is loaded
+from and saved to a JSON file so it survives restarts.
+
+Usage:
+    cache = ResponseCache(maxsize=256, ttl=600)
+    key = cache.key("gemini", "models/gemini-2.5-flash", None, prompt)
+    reply = cache.get(key)
+    if reply is None:
+        reply = call_model(prompt)
+        cache.put(key, reply)
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+_SPACES_RE = re.compile(r"\s+")
+_TRAILING_PUNCT = " ?!.,;:…"
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Return *prompt* in NFC, lowercased, with collapsed spaces and no trailing punctuation."""
+    text = unicodedata.normalize("NFC", prompt or "").lower()
+    return _SPACES_RE.sub(" ", text).strip().rstrip(_TRAILING_PUNCT)
+
+
+class ResponseCache:
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = 600.0, path: Optional[str] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = path or None
+        self.hits = 0
+        self.misses = 0
+        # key -> (reply, expires_at as wall-clock time so it can be persisted)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        if self.path:
+            self.load()
+
+    @staticmethod
+    def key(provider: str, model: Optional[str], system_prompt: Optional[str], prompt: str) -> str:
+        return json.dumps([provider, model, system_prompt, normalize_prompt(prompt)], ensure_ascii=False)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= time.time():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, reply: str) -> None:
+        if self.maxsize <= 0 or not reply:
+            return
+        expires_at = time.time() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (reply, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        if self.path:
+            self.save()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self.path:
+            self.save()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def load(self) -> None:
+        """Read entries from `path`, skipping expired ones. A missing or bad file is ignored."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                rows = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception:
+            logging.exception("ResponseCache: could not read %s", self.path)
+            return
+        now = time.time()
+        with self._lock:
+            for key, reply, expires_at in rows[-self.maxsize:] if self.maxsize > 0 else []:
+                if expires_at is None or expires_at > now:
+                    self._entries[key] = (reply, expires_at)
+
+    def save(self) -> None:
+        """Write entries to `path` (oldest first) through a temp file."""
+        with self._lock:
+            rows = [[key, reply, expires_at] for key, (reply, expires_at) in self._entries.items()]
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(rows, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            logging.exception("ResponseCache: could not write %s", self.path)
@@ -20,11 +20,9 @@ def cleanup_database():
             print("Vui lòng cấu hình trong BOT_TOKEN.env/.env hoặc GitHub Actions secrets.\n")
             return
         
-        from api_client import APIClient
-        from crawl_gold_price import GoldPriceService
+        from registry import get_gold_service
         
-        api_client = APIClient()
-        gold_service = GoldPriceService(api_client)
+        gold_service = get_gold_service()
         result = gold_service.check_database()
         
         print()
@@ -37,14 +35,38 @@ def cleanup_database():
         logging.exception(f"Lỗi khi kiểm tra database: {e}")
 
 
+def migrate_database():
+    """Move the gold price collection into a MongoDB time-series collection."""
+    try:
+        if not MONGO_URI:
+            print("\nKhông có cấu hình MongoDB URI (MONGO_URI)\n")
+            return
+        
+        from db import get_mongo_client, migrate_price_collection
+        
+        client = get_mongo_client()
+        result = migrate_price_collection(client[MONGO_DB_NAME], MONGO_COLLECTION)
+        
+        print()
+        if result['migrated']:
+            print(f"Đã chuyển {result['copied']} bản ghi sang time-series collection '{MONGO_COLLECTION}'")
+            print(f"Collection cũ được giữ lại: {result['legacy']}")
+        else:
+            print(f"Collection '{MONGO_COLLECTION}' không cần chuyển đổi")
+        print()
+        
+        return result
+        
+    except Exception as e:
+        logging.exception(f"Lỗi khi chuyển đổi database: {e}")
+
+
 def show_all_provider_info():
     """Display all gold price information using GoldPriceService.get_info()."""
     try:
-        from api_client import APIClient
-        from crawl_gold_price import GoldPriceService
+        from registry import get_gold_service
         
-        api_client = APIClient()
-        gold_service = GoldPriceService(api_client)
+        gold_service = get_gold_service()
         result = gold_service.get_info()
         
         # Print the formatted message
@@ -63,11 +85,9 @@ def show_all_provider_info():
 def check_price_changes():
     """Check gold price changes using GoldPriceService.get_changes()."""
     try:
-        from api_client import APIClient
-        from crawl_gold_price import GoldPriceService
+        from registry import get_gold_service
         
-        api_client = APIClient()
-        gold_service = GoldPriceService(api_client)
+        gold_service = get_gold_service()
         result = gold_service.get_changes()
         
         # Print the formatted message if there are changes
@@ -110,6 +130,9 @@ if __name__ == "__main__":
         elif command == "db":
             # Check database
             cleanup_database()
+        elif command == "migrate":
+            # Convert the gold collection to a time-series collection
+            migrate_database()
         elif command == "all":
             # Run all diagnostics
             cleanup_database()
@@ -121,6 +144,7 @@ if __name__ == "__main__":
             print("  info     - Hiển thị tất cả thông tin nhà cung cấp")
             print("  changes  - Kiểm tra thay đổi giá cho tất cả nhà cung cấp")
             print("  db       - Kiểm tra cơ sở dữ liệu")
+            print("  migrate  - Chuyển collection giá vàng sang time-series")
             print("  full     - Chạy cả info và changes")
             print("  all      - Chạy tất cả chẩn đoán (db + info + changes)")
             print("  (không tham số) - Chạy BOT.py bình thường")
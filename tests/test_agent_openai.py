@@ -0,0 +1,63 @@
+import json
+from types import SimpleNamespace as NS
+
+from agent import Agent, TOOL_SPECS
+
+
+def _chunk(content=None, tool_calls=None):
+    return NS(choices=[NS(delta=NS(content=content, tool_calls=tool_calls))])
+
+
+def _fragment(index, id=None, name=None, arguments=None):
+    return NS(index=index, id=id, function=NS(name=name, arguments=arguments))
+
+
+class FakeCompletions:
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.requests = []
+
+    def create(self, messages, stream, **options):
+        self.requests.append({"messages": [dict(m) for m in messages], **options})
+        return iter(self.replies.pop(0))
+
+
+def _agent(replies, tools=True):
+    agent = object.__new__(Agent)
+    agent.provider = "openai"
+    agent.openai_model = "gpt-test"
+    agent.tools_enabled = tools
+    completions = FakeCompletions(replies)
+    agent.openai_client = NS(chat=NS(completions=completions))
+    agent.call_tool = lambda name, arguments: json.dumps({"tool": name, "arguments": json.loads(arguments)})
+    return agent, completions
+
+
+def test_streams_text():
+    agent, completions = _agent([[NS(choices=[]), _chunk("Xin "), _chunk("chào")]], tools=False)
+    state = {}
+    history = [{"role": "user", "content": "hi"}]
+    assert "".join(agent._stream_openai(history, None, state)) == "Xin chào"
+    assert "tools" not in completions.requests[0]
+    assert state == {}
+
+
+def test_answers_fragmented_tool_call():
+    agent, completions = _agent([
+        [
+            _chunk(tool_calls=[_fragment(0, id="call_1", name="get_money_rate", arguments='{"co')]),
+            _chunk(tool_calls=[_fragment(0, arguments='de": "USD"}')]),
+        ],
+        [_chunk("USD: 25.000")],
+    ])
+    state = {}
+    reply = "".join(agent._stream_openai([{"role": "user", "content": "tỷ giá USD"}], None, state))
+
+    assert reply == "USD: 25.000"
+    assert state["tools_used"] is True
+    assert completions.requests[0]["tools"] == [{"type": "function", "function": spec} for spec in TOOL_SPECS]
+    follow_up = completions.requests[1]["messages"]
+    assert follow_up[-2]["tool_calls"] == [{"id": "call_1", "type": "function", "function": {
+        "name": "get_money_rate", "arguments": '{"code": "USD"}'}}]
+    assert follow_up[-1]["role"] == "tool" and follow_up[-1]["tool_call_id"] == "call_1"
+    assert json.loads(follow_up[-1]["content"]) == {"tool": "get_money_rate", "arguments": {"code": "USD"}}
@@ -0,0 +1,43 @@
+import asyncio
+
+from telegram.error import RetryAfter
+
+import message
+
+
+class FloodedBot:
+    """Bot whose send_message raises RetryAfter for the given call numbers."""
+
+    def __init__(self, flooded_calls):
+        self.flooded_calls = set(flooded_calls)
+        self.calls = 0
+        self.sent = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.calls += 1
+        if self.calls in self.flooded_calls:
+            raise RetryAfter(0)
+        self.sent.append(text)
+
+
+def _deliver(monkeypatch, bot, text):
+    monkeypatch.setattr(message, "PRIVATE_CHAT_INTERVAL", 0.0)
+    monkeypatch.setattr(message, "GLOBAL_MESSAGES_PER_SEC", 1e9)
+    monkeypatch.setattr(message, "_chat_next_send", {})
+    monkeypatch.setattr(message, "_global_next_send", 0.0)
+    monkeypatch.setattr(message, "_global_send_lock", None)
+    return asyncio.run(message._deliver(bot, 1, text))
+
+
+def test_retry_after_on_late_chunk_is_retried(monkeypatch):
+    bot = FloodedBot(flooded_calls=[5])
+    report = _deliver(monkeypatch, bot, "x" * 4096 * 5)
+    assert report == {"ok": True, "error": None, "attempts": 6}
+    assert len(bot.sent) == 5
+
+
+def test_gives_up_after_max_retries_per_chunk(monkeypatch):
+    bot = FloodedBot(flooded_calls=range(2, 2 + message.BROADCAST_MAX_RETRIES + 1))
+    report = _deliver(monkeypatch, bot, "x" * 4096 * 2)
+    assert report["ok"] is False
+    assert len(bot.sent) == 1
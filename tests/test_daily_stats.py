@@ -0,0 +1,45 @@
+import datetime as dt
+
+import mongomock
+import pytest
+
+from crawl_gold_price import GoldPriceService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    svc = GoldPriceService(None, mongo_uri="")
+    svc.mongo_coll = object()  # only _daily_counts touches it, and that is stubbed
+    svc.stats_coll = mongomock.MongoClient()["db"]["gold-daily-stats"]
+    svc.counts = {}
+    svc.today = dt.datetime(2024, 5, 2)
+    monkeypatch.setattr(svc, "_day_bounds", lambda: (svc.today, svc.today - dt.timedelta(days=1)))
+    monkeypatch.setattr(svc, "_daily_counts", lambda start, end=None: {
+        day: pairs for day, pairs in svc.counts.items() if day >= start.strftime("%Y-%m-%d")
+    })
+    return svc
+
+
+def test_day_stored_as_today_is_recomputed_next_day(service):
+    service.counts = {"2024-05-02": {("doji", "SJC"): 2}}
+    daily = service.refresh_daily_stats(days=2)
+    assert daily["2024-05-02"]["total"] == 2
+    assert daily["2024-05-02"]["complete"] is False
+
+    # More docs arrive after the first check; the next day reads it again
+    service.counts = {"2024-05-02": {("doji", "SJC"): 5}, "2024-05-03": {("doji", "SJC"): 1}}
+    service.today = dt.datetime(2024, 5, 3)
+    daily = service.refresh_daily_stats(days=2)
+    assert daily["2024-05-02"]["total"] == 5
+    assert daily["2024-05-02"]["complete"] is True
+    assert daily["2024-05-03"]["total"] == 1
+
+
+def test_complete_days_are_not_recomputed(service):
+    service.counts = {"2024-05-01": {("doji", "SJC"): 3}, "2024-05-02": {("doji", "SJC"): 1}}
+    service.refresh_daily_stats(days=2)
+
+    service.counts = {"2024-05-01": {("doji", "SJC"): 99}, "2024-05-02": {("doji", "SJC"): 4}}
+    daily = service.refresh_daily_stats(days=2)
+    assert daily["2024-05-01"]["total"] == 3
+    assert daily["2024-05-02"]["total"] == 4
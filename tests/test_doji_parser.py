@@ -0,0 +1,41 @@
+import os
+
+from doji_parser import find_price_rows
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures")
+TARGETS = ["SJC - Bán Lẻ", "Nhẫn Tròn 9999 Hưng Thịnh Vượng - Bán Lẻ"]
+
+
+def _row(label, buy, sell):
+    return f'<tr><td class="label">{label}</td><td><div>{buy}</div><span>+50</span></td><td>{sell}</td></tr>'
+
+
+def test_plain_labels():
+    raw = _row("DOJI HN - Bán Lẻ", "14,850", "15,050") + _row("SJC - Bán Lẻ", "14,900", "15,100")
+    assert find_price_rows(raw, ["SJC - Bán Lẻ"]) == [("SJC - Bán Lẻ", ["14,900", "15,100"])]
+
+
+def test_label_with_inline_tags():
+    raw = _row('<span>SJC - <b>Bán Lẻ</b></span>', "14,900", "15,100")
+    assert find_price_rows(raw, ["SJC - Bán Lẻ"]) == [("SJC - Bán Lẻ", ["14,900", "15,100"])]
+
+
+def test_label_with_entities():
+    raw = _row("SJC&nbsp;- B&aacute;n L&#7867;", "14,900", "15,100")
+    assert find_price_rows(raw, ["SJC\xa0- Bán Lẻ", "SJC - Bán Lẻ"]) == [("SJC\xa0- Bán Lẻ", ["14,900", "15,100"])]
+    raw = _row("SJC - B&aacute;n L&#7867;", "14,900", "15,100")
+    assert find_price_rows(raw, ["SJC - Bán Lẻ"]) == [("SJC - Bán Lẻ", ["14,900", "15,100"])]
+
+
+def test_first_row_per_target_only():
+    raw = _row("SJC - Bán Lẻ", "14,900", "15,100") + _row("SJC - Bán Lẻ", "14,700", "14,900")
+    assert find_price_rows(raw, ["SJC - Bán Lẻ"]) == [("SJC - Bán Lẻ", ["14,900", "15,100"])]
+
+
+def test_fixture_with_tagged_and_duplicate_labels():
+    with open(os.path.join(FIXTURES, "doji_tagged_dup.dat"), encoding="utf-8") as f:
+        raw = f.read()
+    assert find_price_rows(raw, TARGETS) == [
+        ("SJC - Bán Lẻ", ["14,628", "14,828"]),
+        ("Nhẫn Tròn 9999 Hưng Thịnh Vượng - Bán Lẻ", ["14,406", "14,606"]),
+    ]
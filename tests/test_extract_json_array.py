@@ -0,0 +1,45 @@
+import json
+
+from api_client import APIResponse, extract_json_array
+
+
+def _resp(body):
+    content = body.encode("utf-8") if isinstance(body, str) else json.dumps(body).encode("utf-8")
+    return APIResponse(True, 200, {}, content)
+
+
+def test_top_level_key():
+    assert extract_json_array(_resp({"ok": True, "data": [{"a": 1}, {"a": 2}]}), "data") == [{"a": 1}, {"a": 2}]
+
+
+def test_nested_key_is_skipped():
+    assert extract_json_array(_resp('{"meta": {"data": []}, "data": [{"a": 1}]}'), "data") == [{"a": 1}]
+    assert extract_json_array(_resp('{"meta": {"data": [1]}}'), "data") is None
+
+
+def test_empty_array():
+    assert extract_json_array(_resp('{"data": []}'), "data") == []
+
+
+def test_key_inside_string_value():
+    body = '{"note": "\\"data\\": [1, 2]", "data": [3]}'
+    assert extract_json_array(_resp(body), "data") == [3]
+    assert extract_json_array(_resp('{"note": "{\\"data\\": [1]}"}'), "data") is None
+
+
+def test_key_used_as_value():
+    assert extract_json_array(_resp('{"name": "data", "data": [1]}'), "data") == [1]
+
+
+def test_missing_key():
+    assert extract_json_array(_resp({"items": [1]}), "data") is None
+    assert extract_json_array(_resp('[{"data": [1]}]'), "data") is None
+
+
+def test_non_array_value():
+    assert extract_json_array(_resp({"data": {"a": 1}}), "data") is None
+
+
+def test_parsed_json_fallback():
+    assert extract_json_array({"json": {"data": [1]}}, "data") == [1]
+    assert extract_json_array({"json": None}, "data") is None
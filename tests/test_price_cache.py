@@ -0,0 +1,60 @@
+import datetime as dt
+
+import mongomock
+
+import crawl_gold_price
+from crawl_gold_price import GoldPriceService
+
+
+class CountingCollection:
+    """Wrap a mongomock collection and record every aggregation pipeline."""
+
+    def __init__(self, coll):
+        self._coll = coll
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return self._coll.aggregate(pipeline)
+
+    def __getattr__(self, name):
+        return getattr(self._coll, name)
+
+
+def _service(monkeypatch):
+    client = mongomock.MongoClient()
+    coll = client["db"]["gold"]
+    now = dt.datetime.utcnow()
+    for source, code, buy in [("mihong", "SJC", 1), ("mihong", "SJC", 2), ("doji", "999", 3)]:
+        coll.insert_one({"timestamp": now, "source": source, "code": code, "buy": buy, "sell": buy,
+                         "meta": {"source": source, "code": code}})
+        now += dt.timedelta(seconds=1)
+    counting = CountingCollection(coll)
+    monkeypatch.setattr(crawl_gold_price, "get_mongo_client", lambda uri: client)
+    monkeypatch.setattr(crawl_gold_price, "ensure_price_collection", lambda db, name, ts: False)
+    svc = GoldPriceService(None, mongo_uri="mongodb://example", db_name="db", collection="gold",
+                           stats_collection=None, write_concern={})
+    svc.mongo_coll = counting
+    # mongomock compares naive datetimes only
+    today = dt.datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    monkeypatch.setattr(svc, "_day_bounds", lambda: (today, today - dt.timedelta(days=1)))
+    return svc, counting
+
+
+def test_init_does_not_scan_the_collection(monkeypatch):
+    svc, counting = _service(monkeypatch)
+    assert counting.pipelines == []
+    assert svc._last_prices == {}
+
+
+def test_snapshot_context_loads_only_requested_pairs(monkeypatch):
+    svc, counting = _service(monkeypatch)
+    context = svc._load_price_context([("Mi Hong", "SJC")])
+    assert context[("mihong", "SJC")]["latest"]["buy"] == 2
+    assert list(svc._last_prices) == [("mihong", "SJC")]
+    assert all("$match" in pipeline[0] for pipeline in counting.pipelines)
+
+    # the second tick is served from memory
+    counting.pipelines.clear()
+    svc._load_price_context([("Mi Hong", "SJC")])
+    assert counting.pipelines == []
@@ -0,0 +1,58 @@
+import crawl_gold_price
+from crawl_gold_price import GoldPriceService
+
+
+class FakeProvider:
+    def __init__(self, name, refresh_interval, priority=10):
+        self.name = name
+        self.refresh_interval = refresh_interval
+        self.timeout = None
+        self.priority = priority
+        self.fetches = 0
+
+    def fetch(self):
+        self.fetches += 1
+        return {"name": self.name, "status": "ok", "items": [{"code": "SJC", "buyPrice": self.fetches}]}
+
+
+def _service(*providers):
+    svc = GoldPriceService(None, mongo_uri="", parallel=False)
+    svc.providers = []
+    svc.poll_interval_overrides = {}
+    for provider in providers:
+        svc.register_provider(provider)
+    return svc
+
+
+def test_provider_fetched_every_tick_despite_jitter(monkeypatch):
+    provider = FakeProvider("Mi Hong", 300)
+    svc = _service(provider)
+    # a watcher ticking every 300s, each tick landing a few ms early
+    for tick in (0.0, 299.997, 599.995, 899.998):
+        monkeypatch.setattr(crawl_gold_price.time, "monotonic", lambda tick=tick: tick)
+        svc._fetch_all_providers()
+    assert provider.fetches == 4
+
+
+def test_provider_reused_within_interval(monkeypatch):
+    fast, slow = FakeProvider("Mi Hong", 60), FakeProvider("Doji", 1800, priority=20)
+    svc = _service(fast, slow)
+    for tick in range(0, 600, 60):
+        monkeypatch.setattr(crawl_gold_price.time, "monotonic", lambda tick=tick: float(tick))
+        results = svc._fetch_all_providers()
+    assert fast.fetches == 10
+    assert slow.fetches == 1
+    assert [r["name"] for r in results] == ["Mi Hong", "Doji"]
+
+
+def test_get_changes_never_reuses_a_snapshot(monkeypatch):
+    svc = _service(FakeProvider("Mi Hong", 300))
+    builds = []
+    monkeypatch.setattr(svc, "_build_snapshot", lambda: builds.append(1) or {"sources": [], "normalized": []})
+    svc.get_snapshot()
+    svc.get_changes()
+    svc.get_changes()
+    assert len(builds) == 3
+    # plain readers still share the cached snapshot
+    svc.get_snapshot()
+    assert len(builds) == 3
@@ -0,0 +1,36 @@
+import mongomock
+import pytest
+
+import config
+import crawl_gold_price
+from crawl_gold_price import GoldPriceService
+
+
+@pytest.mark.parametrize("w, j, expected", [
+    ("", "", {}),
+    ("majority", "", {"w": "majority"}),
+    ("1", "0", {"w": 1, "j": False}),
+    ("", "true", {"j": True}),
+])
+def test_gold_write_concern_from_env(monkeypatch, w, j, expected):
+    monkeypatch.setattr(config, "GOLD_WRITE_CONCERN_W", w)
+    monkeypatch.setattr(config, "GOLD_WRITE_CONCERN_J", j)
+    assert config.get_gold_write_concern() == expected
+
+
+def _service(monkeypatch, **kwargs):
+    client = mongomock.MongoClient()
+    monkeypatch.setattr(crawl_gold_price, "get_mongo_client", lambda uri: client)
+    monkeypatch.setattr(crawl_gold_price, "ensure_price_collection", lambda db, name, ts: False)
+    return GoldPriceService(None, mongo_uri="mongodb://example", stats_collection=None, **kwargs)
+
+
+def test_unset_write_concern_is_inherited(monkeypatch):
+    monkeypatch.setattr(crawl_gold_price, "get_gold_write_concern", lambda: {})
+    svc = _service(monkeypatch)
+    assert svc.mongo_coll.write_concern.document == {}
+
+
+def test_explicit_write_concern_is_applied(monkeypatch):
+    svc = _service(monkeypatch, write_concern={"w": 1, "j": False})
+    assert svc.mongo_coll.write_concern.document == {"w": 1, "j": False}
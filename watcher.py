@@ -1,23 +1,29 @@
 import asyncio
 import logging
-from typing import Optional, List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, List
 
-from config import MONGO_URI, MONGO_DB_NAME, MONGO_COLLECTION
+from config import MONGO_URI, MONGO_DB_NAME, MONGO_COLLECTION, GOLD_TIME_SERIES
 
 try:
-    from pymongo import MongoClient, ASCENDING, DESCENDING
+    from pymongo import ASCENDING, DESCENDING
 except Exception:
-    MongoClient = None
     ASCENDING = None
     DESCENDING = None
 
+from db import ensure_price_collection, get_mongo_client
+
 # Prefer top-level imports for clarity; these may be missing in some test contexts
 try:
-    from api_client import APIClient
-    from crawl_gold_price import GoldPriceService
+    from registry import get_gold_service
+except Exception:
+    get_gold_service = None
+
+try:
+    from message import broadcast
 except Exception:
-    APIClient = None
-    GoldPriceService = None
+    broadcast = None
 
 
 class GoldWatcher:
@@ -29,19 +35,22 @@ class GoldWatcher:
       job_queue.run_repeating(watcher.job, interval=600)  # Change detection
     """
 
-    def __init__(self, agent, mongo_uri: str, db_name: str = MONGO_DB_NAME, collection: str = MONGO_COLLECTION, chat_id: Optional[int] = None):
-        if MongoClient is None:
+    def __init__(self, agent, mongo_uri: str, db_name: str = MONGO_DB_NAME, collection: str = MONGO_COLLECTION, chat_id: Optional[int] = None,
+                 max_workers: int = 2):
+        if ASCENDING is None:
             raise RuntimeError('pymongo is required for GoldWatcher (install pymongo)')
         self.agent = agent
         self.mongo_uri = mongo_uri
-        self.client = MongoClient(mongo_uri, serverSelectionTimeoutMS=5000)
+        self.client = get_mongo_client(mongo_uri)
+        if self.client is None:
+            raise RuntimeError('GoldWatcher: could not connect to MongoDB')
         self.db = self.client[db_name]
         self.coll = self.db[collection]
-        # ensure indexes
+        # ensure the collection layout and indexes
         try:
-            self.coll.create_index([('source', ASCENDING), ('code', ASCENDING), ('timestamp', DESCENDING)])
+            ensure_price_collection(self.db, collection, GOLD_TIME_SERIES)
         except Exception:
-            logging.exception('Could not create index on %s', collection)
+            logging.exception('Could not prepare collection %s', collection)
         # Normalize chat id(s) to a list for multi-chat sending
         if chat_id is None:
             self.chat_ids = []
@@ -52,17 +61,71 @@ class GoldWatcher:
         # keep backward-compatible single chat_id reference (first in list)
         self.chat_id = self.chat_ids[0] if self.chat_ids else None
         
-        # Create GoldPriceService for formatting and data retrieval (optional)
+        # Shared GoldPriceService for formatting and data retrieval (optional)
         self.gold_service = None
-        if APIClient and GoldPriceService:
+        if get_gold_service:
             try:
-                api_client = APIClient()
-                self.gold_service = GoldPriceService(api_client, mongo_uri, db_name, collection)
+                self.gold_service = get_gold_service(mongo_uri, db_name, collection)
             except Exception:
                 logging.exception('Failed to create GoldPriceService in watcher')
         else:
             logging.debug('GoldPriceService not available; continuing without it')
 
+        # Crawls and DB work run on this bounded pool, never on the event loop.
+        # A job whose previous run is still going skips its tick.
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='gold-watcher')
+        self._running: set = set()
+        self.metrics: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def poll_interval(self) -> float:
+        """Seconds between change checks: the fastest provider's refresh interval."""
+        if self.gold_service is None:
+            return 300.0
+        return max(10.0, self.gold_service.poll_interval())
+
+    async def _run_blocking(self, name: str, func: Callable[[], Any]) -> Any:
+        """Run *func* on the watcher pool, timing it and skipping overlapping runs.
+
+        Returns None when the tick was skipped; exceptions from *func* propagate.
+        """
+        stats = self.metrics.setdefault(name, {
+            'runs': 0, 'skipped': 0, 'failures': 0,
+            'last_duration': None, 'max_duration': 0.0, 'total_duration': 0.0,
+        })
+        if name in self._running:
+            stats['skipped'] += 1
+            logging.warning('GoldWatcher %s: previous run still in progress; skipping tick', name)
+            return None
+
+        self._running.add(name)
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func)
+        except Exception:
+            stats['failures'] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self._running.discard(name)
+            stats['runs'] += 1
+            stats['last_duration'] = elapsed
+            stats['max_duration'] = max(stats['max_duration'], elapsed)
+            stats['total_duration'] += elapsed
+            logging.info('GoldWatcher %s: blocking work took %.2fs', name, elapsed)
+
+    async def _broadcast(self, context, message: str) -> None:
+        if broadcast is not None:
+            await broadcast(context.bot, self.chat_ids, message)
+            return
+        for cid in self.chat_ids:
+            try:
+                kwargs = {'message_thread_id': 2} if cid == -1003835873764 else {}
+                await context.bot.send_message(chat_id=cid, text=message, **kwargs)
+            except Exception:
+                logging.exception('Failed to send gold message to %s', cid)
+
     async def job_info(self, context):
         """Periodic sender: always send `info` style message."""
         if self.gold_service is None:
@@ -70,7 +133,9 @@ class GoldWatcher:
             return
             
         try:
-            result = self.gold_service.get_info()
+            result = await self._run_blocking('info', self.gold_service.get_info)
+            if result is None:
+                return
             message = result.get('message')
         except Exception:
             logging.exception('Failed to get info from GoldPriceService')
@@ -80,14 +145,9 @@ class GoldWatcher:
             logging.info('GoldWatcher info job: no message generated')
             return
 
-        # If configured with multiple chat ids, send to all of them
+        # If configured with multiple chat ids, send to all of them concurrently
         if self.chat_ids:
-            for cid in self.chat_ids:
-                try:
-                    kwargs = {'message_thread_id': 2} if cid == -1003835873764 else {}
-                    await context.bot.send_message(chat_id=cid, text=message, **kwargs)
-                except Exception:
-                    logging.exception('Failed to send gold info message to %s', cid)
+            await self._broadcast(context, message)
             return
 
         # fallback: try to infer a single chat id from context
@@ -115,7 +175,9 @@ class GoldWatcher:
             return
             
         try:
-            result = self.gold_service.get_changes()
+            result = await self._run_blocking('changes', self.gold_service.get_changes)
+            if result is None:
+                return
             message = result.get('message')
             has_changes = result.get('has_any_change', False)
         except Exception:
@@ -126,14 +188,9 @@ class GoldWatcher:
             logging.debug('GoldWatcher: no changes detected')
             return
 
-        # If configured with multiple chat ids, send to all of them
+        # If configured with multiple chat ids, send to all of them concurrently
         if self.chat_ids:
-            for cid in self.chat_ids:
-                try:
-                    kwargs = {'message_thread_id': 2} if cid == -1003835873764 else {}
-                    await context.bot.send_message(chat_id=cid, text=message, **kwargs)
-                except Exception:
-                    logging.exception('Failed to send gold changes message to %s', cid)
+            await self._broadcast(context, message)
             return
 
         # fallback: try to infer a single chat id from context